@@ -0,0 +1,62 @@
+"""Benchmark of per-day calorie bucketing for heavy loggers.
+
+Run from the backend directory: python -m benchmarks.bench_stats
+"""
+
+import datetime
+import random
+import sys
+import timeit
+from dataclasses import dataclass
+
+from lib.service import stats
+
+MEAL_COUNTS = (1000, 10000, 100000)
+REPEATS = 5
+
+
+@dataclass
+class _Meal:
+    calories: float
+    created_date: datetime.datetime
+
+
+def _nested_scan(meals):
+    """Bucket meals the way the stats handler used to: one scan per day."""
+    return [
+        sum(
+            meal.calories for meal in meals if meal.created_date.date()
+            == datetime.datetime.now().date() - datetime.timedelta(days=day)
+        ) for day in range(stats.DAYS_IN_WEEK)
+    ]
+
+
+def _one_pass(meals):
+    return stats.sum_calories_by_day(stats.meal_entries(meals))
+
+
+def _make_meals(count):
+    now = datetime.datetime.now()
+    week_minutes = stats.DAYS_IN_WEEK * 24 * 60
+    return [
+        _Meal(
+            calories=random.uniform(50, 900),  # noqa: S311
+            created_date=now - datetime.timedelta(
+                minutes=random.randrange(week_minutes),  # noqa: S311
+            ),
+        )
+        for _ in range(count)
+    ]
+
+
+def main():
+    """Print the best time of both implementations for several meal counts."""
+    for count in MEAL_COUNTS:
+        meals = _make_meals(count)
+        for name, bucket in (('nested scan', _nested_scan), ('one pass', _one_pass)):
+            best = min(timeit.repeat(lambda: bucket(meals), number=1, repeat=REPEATS))
+            sys.stdout.write(f'{count:>7} meals  {name:<12} {best * 1000:9.2f} ms\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Asyncio HTTP nutrition server."""
+import datetime
+import json
+
+from aiohttp import web
+
+from lib import config
+from lib.database.async_session import AsyncBaseNutritionRepository
+from lib.service import stats
+from lib.service.interfaces import nutrition
+
+
+def _json_response(payload: dict, status: int = config.OK) -> web.Response:
+    return web.Response(
+        status=status,
+        body=json.dumps(payload, ensure_ascii=False).encode(config.UTF8),
+        content_type=config.JSON_TYPE,
+    )
+
+
+def nutrition_app_factory(
+    nutrition_provider: nutrition.AsyncNutritionProvider,
+    nutrition_repository: AsyncBaseNutritionRepository,
+) -> web.Application:
+    """Create the aiohttp application.
+
+    Only POST /api/v1/meals and GET /api/v1/stats are served. Bulk ingestion,
+    streaming, jobs, /api/v1/metrics, warming up the model (OLLAMA_WARMUP)
+    and keeping it loaded (OLLAMA_PING_INTERVAL) need the blocking server
+    (SERVER_MODE threaded or single).
+
+    Args:
+        nutrition_provider (nutrition.AsyncNutritionProvider): class that provides interface.
+        nutrition_repository (AsyncBaseNutritionRepository): class that provides interface.
+
+    Returns:
+        web.Application: application for the asyncio server.
+    """
+    async def post_meal(request: web.Request) -> web.Response:
+        meal_info = json.loads(await request.read())
+
+        if 'user_id' not in meal_info or 'description' not in meal_info:
+            return _json_response(
+                {config.ERROR: 'Invalid request, missing user_id or description'},
+                config.BAD_REQUEST,
+            )
+
+        user_id = meal_info['user_id']
+        description = meal_info['description']
+        created_date = meal_info.get('created_date', datetime.datetime.now())
+
+        try:
+            nutrition_info = await nutrition_provider.get_nutrition(meal_description=description)
+        except Exception as err:
+            return _json_response(
+                {config.ERROR: 'Server did not recognize the request.', 'details': str(err)},
+                config.BAD_REQUEST,
+            )
+
+        response = await nutrition_repository.insert_meal(
+            user_id=user_id,
+            description=description,
+            calories=nutrition_info.calories,
+            created_date=created_date,
+        )
+        if response['status'] == config.ERROR:
+            return _json_response(response, config.INTERNAL_SERVER_ERROR)
+        return _json_response({"calories": nutrition_info.calories})
+
+    async def get_stats(request: web.Request) -> web.Response:
+        user_id = request.query.get('user_id')
+        if not user_id:
+            return _json_response(
+                {config.ERROR: 'Missing user_id parameter'}, config.BAD_REQUEST,
+            )
+
+        daily_calories = await nutrition_repository.get_daily_calories(user_id)
+        if isinstance(daily_calories, dict) and daily_calories.get('status') == config.ERROR:
+            return _json_response(daily_calories, config.INTERNAL_SERVER_ERROR)
+        if not daily_calories:
+            return web.Response(status=config.NOT_FOUND)
+
+        try:
+            recommendations = await nutrition_provider.get_recommendations(
+                stats.daily_calories_to_past_data(daily_calories),
+            )
+        except Exception as err:
+            return _json_response(
+                {config.ERROR: 'Error fetching recommendations', 'details': str(err)},
+                config.INTERNAL_SERVER_ERROR,
+            )
+        return _json_response({"recommendations": recommendations})
+
+    async def close_provider(_: web.Application) -> None:
+        await nutrition_provider.close()
+
+    app = web.Application()
+    app.router.add_post('/api/v1/meals', post_meal)
+    app.router.add_get('/api/v1/stats', get_stats)
+    app.on_cleanup.append(close_provider)
+    return app
+
+
+def run(app, port=8000):
+    """Start the asyncio server.
+
+    Args:
+        app (web.Application | Awaitable[web.Application]): application or coroutine
+            that creates it inside the event loop.
+        port (int, optional): port for server. Defaults to 8000.
+    """
+    web.run_app(app, port=port)
@@ -2,10 +2,52 @@
 HEADER_TYPE = 'Content-Type'
 HEADER_LENGTH = 'Content-Length'
 JSON_TYPE = 'application/json'
+EVENT_STREAM_TYPE = 'text/event-stream'
 OK = 200
+ACCEPTED = 202
 NOT_FOUND = 404
 BAD_REQUEST = 400
 INTERNAL_SERVER_ERROR = 500
+SERVICE_UNAVAILABLE = 503
 TIMEOUT = 60
+OLLAMA_URL = 'http://localhost:11434'
 ERROR = 'error'
 UTF8 = 'utf-8'
+SERVER_MAX_WORKERS = 16
+SERVER_QUEUE_SIZE = 64
+OLLAMA_POOL_CONNECTIONS = 4
+OLLAMA_POOL_MAXSIZE = 16
+NUTRITION_CACHE_SIZE = 10000
+NUTRITION_CACHE_TTL = 7 * 24 * 60 * 60
+NUTRITION_BATCH_SIZE = 8
+NUTRITION_BATCH_LATENCY = 0.05
+NUTRITION_BATCH_WORKERS = 4
+DB_POOL_SIZE = 16
+DB_MAX_OVERFLOW = 8
+DB_POOL_TIMEOUT = 30
+DB_POOL_RECYCLE = 30 * 60
+DB_STATEMENT_TIMEOUT_MS = 10000
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_DELAY = 0.01
+BULK_MAX_ITEMS = 10000
+BULK_ESTIMATE_WORKERS = 4
+BULK_INSERT_CHUNK = 1000
+RECOMMENDATION_CACHE_SIZE = 10000
+RECOMMENDATION_CACHE_TTL = 24 * 60 * 60
+PRECOMPUTE_DELAY = 30
+JOB_WORKERS = 8
+JOB_MAX_PENDING = 256
+JOB_TTL = 60 * 60
+OLLAMA_EJECT_FAILURES = 3
+OLLAMA_EJECT_TIME = 30
+OLLAMA_SLOW_FACTOR = 4
+OLLAMA_LATENCY_DECAY = 0.2
+OLLAMA_HEALTH_INTERVAL = 10
+CIRCUIT_FAILURE_RATE = 0.5
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 5
+CIRCUIT_SLOW_CALL = 20
+CIRCUIT_RECOMMENDATIONS_SLOW_CALL = 50
+CIRCUIT_OPEN_TIME = 30
+OFFLINE_MIN_CONFIDENCE = 0.8
+OLLAMA_PING_INTERVAL = 0
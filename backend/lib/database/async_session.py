@@ -0,0 +1,149 @@
+"""File with class AsyncNutritionRepository for asyncio interactions with the database."""
+
+import abc
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, func, select
+
+from lib import config
+from lib.database.models import Meal
+from lib.service.stats import DAYS_IN_WEEK
+
+
+class AsyncBaseNutritionRepository(abc.ABC):
+    """Class with interface for AsyncNutritionRepository."""
+
+    @abc.abstractmethod
+    def __init__(self, session) -> None:
+        """Create interface for AsyncNutritionRepository.
+
+        Args:
+            session (_type_): async_sessionmaker.
+        """
+
+    @abc.abstractmethod
+    async def insert_meal(
+        self, user_id: str, description: str, calories: float, created_date: date,
+    ) -> dict:
+        """Insert a meal into the database.
+
+        Args:
+            user_id (str): ID of the user.
+            description (str): description of the meal.
+            calories (float): number of calories in the meal.
+            created_date (date): The date when the meal was created.
+        """
+
+    @abc.abstractmethod
+    async def get_meals_for_last_week(self, user_id: str):
+        """Get meals for the last week for a given user.
+
+        Args:
+            user_id (str): ID of the user.
+        """
+
+    @abc.abstractmethod
+    async def get_daily_calories(self, user_id: str, days: int = DAYS_IN_WEEK):
+        """Get calories eaten by a given user per day for the last days.
+
+        Args:
+            user_id (str): ID of the user.
+            days (int): number of days including today.
+        """
+
+
+class AsyncNutritionRepository(AsyncBaseNutritionRepository):
+    """Class with async session."""
+
+    def __init__(self, session) -> None:
+        """Get async session for interactions with the database.
+
+        Args:
+            session (_type_): async_sessionmaker.
+        """
+        self.session = session
+
+    async def insert_meal(
+        self, user_id: str, description: str, calories: float, created_date: date,
+    ) -> dict:
+        """Insert a new meal entry into the database.
+
+        Args:
+            user_id (str): The ID of the user for whom to insert the meal.
+            description (str): The description of the meal.
+            calories (float): The number of calories in the meal.
+            created_date (date): The date when the meal was created.
+
+        Returns:
+            dict: A dictionary indicating the status of the operation.
+        """
+        async with self.session() as session:
+            try:
+                session.add(Meal(
+                    user_id=user_id,
+                    description=description,
+                    calories=calories,
+                    created_date=created_date,
+                ))
+                await session.commit()
+            except Exception as err:
+                await session.rollback()
+                return {
+                    'status': config.ERROR,
+                    config.ERROR: 'Database error',
+                    'details': str(err),
+                }
+        return {'status': 'success'}
+
+    async def get_meals_for_last_week(self, user_id: str):
+        """Retrieve meals for the last week for a given user.
+
+        Args:
+            user_id (str): The ID of the user for whom to retrieve meals.
+
+        Returns:
+            list[Meal] or dict: A list of Meal objects representing the meals for the last week,
+            or a dictionary with an error message if an error occurs during database retrieval.
+        """
+        async with self.session() as session:
+            try:
+                one_week_ago = datetime.now() - timedelta(days=7)
+                meals = await session.scalars(select(Meal).filter(
+                    Meal.user_id == user_id, Meal.created_date >= one_week_ago.date(),
+                ))
+            except Exception as err:
+                return {
+                    'status': config.ERROR,
+                    config.ERROR: 'Database error',
+                    'details': str(err),
+                }
+            return meals.all()
+
+    async def get_daily_calories(self, user_id: str, days: int = DAYS_IN_WEEK):
+        """Retrieve calories eaten by a given user per day, summed by the database.
+
+        Args:
+            user_id (str): The ID of the user for whom to retrieve calories.
+            days (int): number of days including today.
+
+        Returns:
+            list[tuple[date, float]] or dict: pairs of a day and calories eaten that day,
+            only for days with meals, or a dictionary with an error message if an error
+            occurs during database retrieval.
+        """
+        async with self.session() as session:
+            try:
+                first_day = date.today() - timedelta(days=days - 1)
+                day = func.date(Meal.created_date, type_=Date)
+                rows = await session.execute(
+                    select(day, func.sum(Meal.calories)).where(
+                        Meal.user_id == user_id, Meal.created_date >= first_day,
+                    ).group_by(day),
+                )
+            except Exception as err:
+                return {
+                    'status': config.ERROR,
+                    config.ERROR: 'Database error',
+                    'details': str(err),
+                }
+            return [(meal_day, calories) for meal_day, calories in rows]
@@ -0,0 +1,114 @@
+"""File with class EstimateRepository for the persistent nutrition estimate cache."""
+
+import abc
+
+from lib import config
+from lib.database.models import NutritionEstimate
+from lib.service.interfaces import nutrition
+
+
+class BaseEstimateRepository(abc.ABC):
+    """Class with interface for EstimateRepository."""
+
+    @abc.abstractmethod
+    def get_estimate(self, description: str, model: str, prompt_version: str):
+        """Get a stored estimate.
+
+        Args:
+            description (str): normalized description of the meal.
+            model (str): name of the model that made the estimate.
+            prompt_version (str): version of the prompt used for the estimate.
+        """
+
+    @abc.abstractmethod
+    def save_estimate(
+        self, description: str, model: str, prompt_version: str,
+        nutrition_info: nutrition.NutritionInfo,
+    ) -> dict:
+        """Store an estimate.
+
+        Args:
+            description (str): normalized description of the meal.
+            model (str): name of the model that made the estimate.
+            prompt_version (str): version of the prompt used for the estimate.
+            nutrition_info (NutritionInfo): the estimate.
+        """
+
+
+class EstimateRepository(BaseEstimateRepository):
+    """Class with session for nutrition estimates."""
+
+    def __init__(self, session) -> None:
+        """Get session for interactions with the database.
+
+        Args:
+            session (_type_): SessionLocal.
+        """
+        self.session = session
+
+    def get_estimate(self, description: str, model: str, prompt_version: str):
+        """Get a stored estimate.
+
+        Args:
+            description (str): normalized description of the meal.
+            model (str): name of the model that made the estimate.
+            prompt_version (str): version of the prompt used for the estimate.
+
+        Returns:
+            NutritionInfo | None | dict: the estimate, None if it is not stored,
+            or a dictionary with an error message if the database fails.
+        """
+        session = self.session()
+        try:
+            estimate = session.get(NutritionEstimate, (description, model, prompt_version))
+        except Exception as err:
+            return {
+                'status': config.ERROR,
+                config.ERROR: 'Database error',
+                'details': str(err),
+            }
+        finally:
+            session.close()
+        if estimate is None:
+            return None
+        return nutrition.NutritionInfo(
+            calories=estimate.calories,
+            proteins=estimate.proteins,
+            carbs=estimate.carbs,
+            fats=estimate.fats,
+        )
+
+    def save_estimate(
+        self, description: str, model: str, prompt_version: str,
+        nutrition_info: nutrition.NutritionInfo,
+    ) -> dict:
+        """Store an estimate, replacing an older one for the same key.
+
+        Args:
+            description (str): normalized description of the meal.
+            model (str): name of the model that made the estimate.
+            prompt_version (str): version of the prompt used for the estimate.
+            nutrition_info (NutritionInfo): the estimate.
+
+        Returns:
+            dict: A dictionary indicating the status of the operation.
+        """
+        session = self.session()
+        try:
+            session.merge(NutritionEstimate(
+                description=description,
+                model=model,
+                prompt_version=prompt_version,
+                **nutrition_info.known_values(),
+            ))
+            session.commit()
+            return {'status': 'success'}
+        except Exception as err:
+            session.rollback()
+            return {
+                'status': config.ERROR,
+                config.ERROR: 'Database error',
+                'details': str(err),
+            }
+        finally:
+            session.close()
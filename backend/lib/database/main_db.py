@@ -3,8 +3,12 @@ import os
 
 import dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from lib import config
+
+from .migrations import ensure_indexes
 from .models import Base
 
 
@@ -22,12 +26,88 @@ def get_db_url() -> str:
     )
 
 
-def init_db():
+def get_engine_options() -> dict:
+    """Get connection pool settings for the engine from the environment.
+
+    PG_POOL_SIZE, PG_MAX_OVERFLOW, PG_POOL_TIMEOUT (seconds to wait for a free
+    connection), PG_POOL_RECYCLE (seconds after which a connection is reopened),
+    PG_POOL_PRE_PING (1 to test connections before use) and
+    PG_STATEMENT_TIMEOUT (milliseconds, 0 disables it) are read.
+
+    Returns:
+        dict: keyword arguments for create_engine.
+    """
+    dotenv.load_dotenv()
+    options = {
+        'pool_size': int(os.environ.get('PG_POOL_SIZE', config.DB_POOL_SIZE)),
+        'max_overflow': int(os.environ.get('PG_MAX_OVERFLOW', config.DB_MAX_OVERFLOW)),
+        'pool_timeout': float(os.environ.get('PG_POOL_TIMEOUT', config.DB_POOL_TIMEOUT)),
+        'pool_recycle': int(os.environ.get('PG_POOL_RECYCLE', config.DB_POOL_RECYCLE)),
+        'pool_pre_ping': os.environ.get('PG_POOL_PRE_PING', '1') == '1',
+    }
+    statement_timeout = int(
+        os.environ.get('PG_STATEMENT_TIMEOUT', config.DB_STATEMENT_TIMEOUT_MS),
+    )
+    if statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
+def get_pool_stats(engine) -> dict:
+    """Get the state of the connection pool of an engine.
+
+    Args:
+        engine (Engine): engine created by create_db_engine.
+
+    Returns:
+        dict: pool size, connections idle in the pool, connections in use and
+        connections opened above pool_size.
+    """
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
+
+
+def create_db_engine():
+    """Create the engine with the connection pool configured from the environment.
+
+    Returns:
+        Engine: engine for the blocking server.
+    """
+    return create_engine(get_db_url(), **get_engine_options())
+
+
+def init_db(engine=None):
     """Create tables in database.
 
+    Args:
+        engine (Engine | None): engine to use, created by create_db_engine if None.
+
     Returns:
         sessionmaker: Session creator.
     """
-    engine = create_engine(get_db_url())
+    if engine is None:
+        engine = create_db_engine()
     Base.metadata.create_all(bind=engine)
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        ensure_indexes(conn)
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+async def init_async_db():
+    """Create tables in database for the asyncio server.
+
+    Returns:
+        async_sessionmaker: Async session creator.
+    """
+    engine = create_async_engine(get_db_url(), **get_engine_options())
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.run_sync(ensure_indexes)
+    return async_sessionmaker(autoflush=False, bind=engine, expire_on_commit=False)
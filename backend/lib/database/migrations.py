@@ -0,0 +1,37 @@
+"""File with migrations for databases created by older versions."""
+
+from sqlalchemy import text
+
+from .models import Base
+
+
+def ensure_indexes(conn) -> None:
+    """Create indexes declared on models that are missing in existing tables.
+
+    ``create_all`` only creates indexes together with new tables, so tables
+    from older deployments are upgraded here. On PostgreSQL the indexes are
+    built with ``CONCURRENTLY`` to keep the table writable; this needs a
+    connection in AUTOCOMMIT mode. If such a build is interrupted, PostgreSQL
+    leaves an INVALID index that has to be dropped by hand before a retry, so
+    PG_STATEMENT_TIMEOUT is lifted for the builds and restored afterwards.
+
+    Args:
+        conn (Connection): connection to the database.
+    """
+    if conn.dialect.name != 'postgresql':
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        return
+    preparer = conn.dialect.identifier_preparer
+    conn.execute(text('SET statement_timeout = 0'))
+    try:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                columns = ', '.join(preparer.quote(column.name) for column in index.columns)
+                conn.execute(text(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {preparer.quote(index.name)} '
+                    + f'ON {preparer.format_table(table)} ({columns})',
+                ))
+    finally:
+        conn.execute(text('RESET statement_timeout'))
@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -14,8 +14,25 @@ class Meal(Base):
     """Class with model for database."""
 
     __tablename__ = 'meal'
+    __table_args__ = (
+        Index('ix_meal_user_id_created_date', 'user_id', 'created_date'),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     user_id: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=False)
     calories: Mapped[float]
     created_date: Mapped[datetime]
+
+
+class NutritionEstimate(Base):
+    """Class with model for nutrition estimates shared between backend replicas."""
+
+    __tablename__ = 'nutrition_estimate'
+    description: Mapped[str] = mapped_column(String, primary_key=True)
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    prompt_version: Mapped[str] = mapped_column(String, primary_key=True)
+    calories: Mapped[float]
+    proteins: Mapped[float | None]
+    carbs: Mapped[float | None]
+    fats: Mapped[float | None]
+    created_date: Mapped[datetime] = mapped_column(default=datetime.now)
@@ -4,8 +4,12 @@
 import abc
 from datetime import date, datetime, timedelta
 
+from sqlalchemy import Date, func, insert, select
+
 from lib import config
+from lib.database.main_db import get_pool_stats
 from lib.database.models import Meal
+from lib.service.stats import DAYS_IN_WEEK
 
 
 class BaseNutritionRepository(abc.ABC):
@@ -37,17 +41,40 @@ class BaseNutritionRepository(abc.ABC):
             user_id (str): ID of the user.
         """
 
+    @abc.abstractmethod
+    def get_daily_calories(self, user_id: str, days: int = DAYS_IN_WEEK):
+        """Get calories eaten by a given user per day for the last days.
+
+        Args:
+            user_id (str): ID of the user.
+            days (int): number of days including today.
+        """
+
+    @abc.abstractmethod
+    def insert_meals(self, meals: list[dict]) -> dict:
+        """Insert several meals into the database in one transaction.
+
+        Args:
+            meals (list[dict]): meals with user_id, description, calories and created_date.
+        """
+
+    @abc.abstractmethod
+    def get_pool_stats(self) -> dict:
+        """Get the state of the database connection pool."""
+
 
 class NutritionRepository(BaseNutritionRepository):
     """Class with session."""
 
-    def __init__(self, session) -> None:
+    def __init__(self, session, engine=None) -> None:
         """Get session for interactions with the database..
 
         Args:
             session (_type_): SessionLocal.
+            engine (Engine | None): engine of the session, needed for pool stats.
         """
         self.session = session
+        self.engine = engine
 
     def insert_meal(self, user_id: str, description: str, calories: float, created_date: date):
         """Insert a new meal entry into the database.
@@ -82,6 +109,30 @@ class NutritionRepository(BaseNutritionRepository):
         finally:
             session.close()
 
+    def insert_meals(self, meals: list[dict]) -> dict:
+        """Insert several meals with one multi-row INSERT and one COMMIT.
+
+        Args:
+            meals (list[dict]): meals with user_id, description, calories and created_date.
+
+        Returns:
+            dict: A dictionary indicating the status of the operation.
+        """
+        session = self.session()
+        try:
+            session.execute(insert(Meal), meals)
+            session.commit()
+            return {'status': 'success'}
+        except Exception as err:
+            session.rollback()
+            return {
+                'status': config.ERROR,
+                config.ERROR: 'Database error',
+                'details': str(err),
+            }
+        finally:
+            session.close()
+
     def get_meals_for_last_week(self, user_id: str):
         """Retrieve meals for the last week for a given user.
 
@@ -106,3 +157,45 @@ class NutritionRepository(BaseNutritionRepository):
             }
         finally:
             session.close()
+
+    def get_daily_calories(self, user_id: str, days: int = DAYS_IN_WEEK):
+        """Retrieve calories eaten by a given user per day, summed by the database.
+
+        Args:
+            user_id (str): The ID of the user for whom to retrieve calories.
+            days (int): number of days including today.
+
+        Returns:
+            list[tuple[date, float]] or dict: pairs of a day and calories eaten that day,
+            only for days with meals, or a dictionary with an error message if an error
+            occurs during database retrieval.
+        """
+        session = self.session()
+        try:
+            first_day = date.today() - timedelta(days=days - 1)
+            day = func.date(Meal.created_date, type_=Date)
+            rows = session.execute(
+                select(day, func.sum(Meal.calories)).where(
+                    Meal.user_id == user_id, Meal.created_date >= first_day,
+                ).group_by(day),
+            )
+            return [(meal_day, calories) for meal_day, calories in rows]
+        except Exception as err:
+            return {
+                'status': config.ERROR,
+                config.ERROR: 'Database error',
+                'details': str(err),
+            }
+        finally:
+            session.close()
+
+    def get_pool_stats(self) -> dict:
+        """Get the state of the database connection pool.
+
+        Returns:
+            dict: pool size, idle, used and overflow connections, empty if the
+            repository was created without an engine.
+        """
+        if self.engine is None:
+            return {}
+        return get_pool_stats(self.engine)
@@ -0,0 +1,139 @@
+"""File with class BufferedNutritionRepository for group commit of meal inserts."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date
+
+from lib import config
+from lib.database.session import BaseNutritionRepository
+from lib.service.stats import DAYS_IN_WEEK
+
+
+class BufferedNutritionRepository(BaseNutritionRepository):
+    """Repository that commits meals of concurrent requests together.
+
+    insert_meal puts the meal into a queue and waits. A flusher thread writes
+    queued meals with one multi-row INSERT and one COMMIT as soon as
+    ``max_batch_size`` meals are queued or the oldest one waited ``max_delay``
+    seconds, then wakes the callers with the result. A caller returns only
+    after its meal is committed, so nothing acknowledged can be lost. If a
+    batch fails, its meals are retried one by one so that one bad meal does
+    not fail the requests of others.
+    """
+
+    def __init__(
+        self, repository: BaseNutritionRepository,
+        max_batch_size: int = config.WRITE_BATCH_SIZE,
+        max_delay: float = config.WRITE_BATCH_DELAY,
+    ) -> None:
+        """Wrap a repository and start the flusher thread.
+
+        Args:
+            repository (BaseNutritionRepository): repository that writes to the database.
+            max_batch_size (int): maximum number of meals in one INSERT.
+            max_delay (float): seconds the first queued meal waits for others.
+        """
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: queue.Queue = queue.Queue()
+        self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+        self._flusher.start()
+
+    def insert_meal(self, user_id: str, description: str, calories: float, created_date: date):
+        """Queue a meal and wait until the batch with it is committed.
+
+        Args:
+            user_id (str): The ID of the user for whom to insert the meal.
+            description (str): The description of the meal.
+            calories (float): The number of calories in the meal.
+            created_date (date): The date when the meal was created.
+
+        Returns:
+            dict: A dictionary indicating the status of the operation.
+        """
+        future = Future()
+        self._pending.put(({
+            'user_id': user_id,
+            'description': description,
+            'calories': calories,
+            'created_date': created_date,
+        }, future))
+        return future.result()
+
+    def insert_meals(self, meals: list[dict]) -> dict:
+        """Insert several meals directly, they already form a batch.
+
+        Args:
+            meals (list[dict]): meals with user_id, description, calories and created_date.
+
+        Returns:
+            dict: A dictionary indicating the status of the operation.
+        """
+        return self.repository.insert_meals(meals)
+
+    def get_meals_for_last_week(self, user_id: str):
+        """Retrieve meals for the last week for a given user.
+
+        Args:
+            user_id (str): The ID of the user for whom to retrieve meals.
+
+        Returns:
+            list[Meal] or dict: meals or a dictionary with an error message.
+        """
+        return self.repository.get_meals_for_last_week(user_id)
+
+    def get_daily_calories(self, user_id: str, days: int = DAYS_IN_WEEK):
+        """Retrieve calories eaten by a given user per day.
+
+        Args:
+            user_id (str): The ID of the user for whom to retrieve calories.
+            days (int): number of days including today.
+
+        Returns:
+            list[tuple[date, float]] or dict: calories by day or a dictionary with an error.
+        """
+        return self.repository.get_daily_calories(user_id, days)
+
+    def get_pool_stats(self) -> dict:
+        """Get the state of the database connection pool and of the write queue.
+
+        Returns:
+            dict: pool statistics and the number of meals waiting for a flush.
+        """
+        return {**self.repository.get_pool_stats(), 'write_queue': self._pending.qsize()}
+
+    def _flush_forever(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        response = self._insert([meal for meal, _ in batch])
+        if response['status'] == config.ERROR and len(batch) > 1:
+            for meal, future in batch:
+                future.set_result(self._insert([meal]))
+            return
+        for _, future in batch:
+            future.set_result(response)
+
+    def _insert(self, meals):
+        try:
+            return self.repository.insert_meals(meals)
+        except Exception as err:
+            return {
+                'status': config.ERROR,
+                config.ERROR: 'Database error',
+                'details': str(err),
+            }
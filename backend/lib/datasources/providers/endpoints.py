@@ -0,0 +1,222 @@
+"""Load balancing between several Ollama nodes."""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from lib import config
+
+NUTRITION = 'nutrition'
+NUTRITION_BATCH = 'nutrition_batch'
+RECOMMENDATIONS = 'recommendations'
+RECOMMENDATIONS_STREAM = 'recommendations_stream'
+
+
+@dataclass
+class Endpoint:
+    """State of one Ollama node.
+
+    Attributes:
+        url (str): base URL of the node.
+        outstanding (int): requests sent and not answered yet.
+        latency (dict[str, float]): moving average of response time in seconds
+            for every kind of request, since a recommendation takes much longer
+            than a meal estimate.
+        failures (int): failed requests in a row.
+        ejected_until (float): monotonic time until which the node gets no requests.
+    """
+
+    url: str
+    outstanding: int = 0
+    latency: dict[str, float] = field(default_factory=dict)
+    failures: int = 0
+    ejected_until: float = 0
+
+
+def parse_urls(urls: str | list[str] | None) -> list[str]:
+    """Split a comma-separated list of node URLs.
+
+    Args:
+        urls (str | list[str] | None): one URL, several separated by commas or a list,
+            None or empty for config.OLLAMA_URL.
+
+    Returns:
+        list[str]: URLs without trailing slashes.
+    """
+    if not urls:
+        return [config.OLLAMA_URL]
+    if isinstance(urls, str):
+        urls = urls.split(',')
+    return [url.strip().rstrip('/') for url in urls if url.strip()]
+
+
+class EndpointPool:
+    """Chooses the node with the fewest outstanding requests.
+
+    Ties are broken by the moving average of latency. A node is ejected for
+    ``eject_time`` seconds after ``eject_failures`` failures in a row or when
+    its latency grows ``slow_factor`` times above the fastest node. Latency is
+    tracked and compared per kind of request, so a node is not ejected for
+    serving longer requests than the others. If every
+    node is ejected, the one that comes back first is still used.
+    """
+
+    def __init__(
+        self, urls: list[str],
+        eject_failures: int = config.OLLAMA_EJECT_FAILURES,
+        eject_time: float = config.OLLAMA_EJECT_TIME,
+        slow_factor: float = config.OLLAMA_SLOW_FACTOR,
+        latency_decay: float = config.OLLAMA_LATENCY_DECAY,
+    ) -> None:
+        """Create the pool.
+
+        Args:
+            urls (list[str]): base URLs of the nodes.
+            eject_failures (int): failures in a row that eject a node.
+            eject_time (float): seconds an ejected node gets no requests.
+            slow_factor (float): how many times slower than the fastest node ejects a node.
+            latency_decay (float): weight of the newest response time in the average.
+
+        Raises:
+            ValueError: If no URL is given.
+        """
+        if not urls:
+            raise ValueError('At least one Ollama URL is required')
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.eject_failures = eject_failures
+        self.eject_time = eject_time
+        self.slow_factor = slow_factor
+        self.latency_decay = latency_decay
+        self._lock = threading.Lock()
+
+    def acquire(self, kind: str = NUTRITION) -> Endpoint:
+        """Choose a node and count a request to it.
+
+        Args:
+            kind (str): kind of request whose latency breaks ties.
+
+        Returns:
+            Endpoint: the chosen node, to be passed to release().
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = [
+                endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now
+            ]
+            if available:
+                endpoint = min(
+                    available,
+                    key=lambda candidate: (candidate.outstanding, candidate.latency.get(kind, 0)),
+                )
+            else:
+                endpoint = min(self.endpoints, key=lambda candidate: candidate.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(
+        self, endpoint: Endpoint, latency: float, ok: bool, kind: str = NUTRITION,
+    ) -> None:
+        """Record the outcome of a request.
+
+        Args:
+            endpoint (Endpoint): node returned by acquire().
+            latency (float): seconds the request took.
+            ok (bool): whether the node answered successfully.
+            kind (str): kind of request, the same as passed to acquire().
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not ok:
+                endpoint.failures += 1
+                if endpoint.failures >= self.eject_failures:
+                    self._eject(endpoint)
+                return
+            endpoint.failures = 0
+            average = endpoint.latency.get(kind)
+            if average is None:
+                endpoint.latency[kind] = latency
+            else:
+                endpoint.latency[kind] = average + self.latency_decay * (latency - average)
+            if self._is_slow(endpoint, kind):
+                self._eject(endpoint)
+
+    @contextmanager
+    def request(self, kind: str = NUTRITION) -> Iterator[str]:
+        """Send one request to the chosen node.
+
+        Args:
+            kind (str): kind of request, e.g. NUTRITION or RECOMMENDATIONS.
+
+        Yields:
+            str: base URL of the node; an exception from the block counts as a failure,
+            a streamed answer the caller stopped reading does not, and a cancelled
+            asyncio request is not recorded at all.
+        """
+        endpoint = self.acquire(kind)
+        started = time.monotonic()
+        ok = False
+        cancelled = False
+        try:
+            yield endpoint.url
+            ok = True
+        except GeneratorExit:
+            ok = True
+            raise
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                with self._lock:
+                    endpoint.outstanding -= 1
+            else:
+                self.release(endpoint, time.monotonic() - started, ok, kind)
+
+    def probe(self, is_healthy: Callable[[str], bool]) -> None:
+        """Eject nodes that fail a health check before requests are sent to them.
+
+        A node that stays down is ejected again on every probe; a node that
+        recovered gets requests once its ejection time is over.
+
+        Args:
+            is_healthy (Callable[[str], bool]): health check of a node by its URL.
+        """
+        for endpoint in self.endpoints:
+            if not is_healthy(endpoint.url):
+                with self._lock:
+                    self._eject(endpoint)
+
+    def stats(self) -> list[dict]:
+        """Get the state of every node.
+
+        Returns:
+            list[dict]: URL, outstanding requests, latency by kind of request
+            and whether the node is ejected.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'url': endpoint.url,
+                    'outstanding': endpoint.outstanding,
+                    'latency': dict(endpoint.latency),
+                    'ejected': endpoint.ejected_until > now,
+                }
+                for endpoint in self.endpoints
+            ]
+
+    def _is_slow(self, endpoint, kind):
+        now = time.monotonic()
+        latencies = [
+            other.latency[kind] for other in self.endpoints
+            if other is not endpoint and kind in other.latency and other.ejected_until <= now
+        ]
+        return bool(latencies) and endpoint.latency[kind] > self.slow_factor * min(latencies)
+
+    def _eject(self, endpoint):
+        endpoint.ejected_until = time.monotonic() + self.eject_time
+        endpoint.failures = 0
+        endpoint.latency.clear()
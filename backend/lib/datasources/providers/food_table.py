@@ -0,0 +1,80 @@
+"""Bundled food-composition table for offline estimates.
+
+Values are per 100 g of the ready-to-eat food. Names are word stems in
+normalized form (lower case, ``ё`` replaced by ``е``), several words are
+separated by spaces.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Food:
+    """Composition of one food.
+
+    Attributes:
+        names (tuple[str, ...]): English and Russian stems of the name.
+        calories (float): kilocalories per 100 g.
+        proteins (float): grams of proteins per 100 g.
+        carbs (float): grams of carbohydrates per 100 g.
+        fats (float): grams of fats per 100 g.
+        piece (float | None): grams in one piece, cup or slice, None if not countable.
+        serving (float): grams in a usual serving when no amount is given.
+    """
+
+    names: tuple[str, ...]
+    calories: float
+    proteins: float
+    carbs: float
+    fats: float
+    piece: float | None
+    serving: float
+
+
+FOODS = (
+    Food(('egg', 'яйц', 'яиц', 'яичк'), 155, 13, 1.1, 11, 50, 50),
+    Food(('banana', 'банан'), 89, 1.1, 23, 0.3, 120, 120),
+    Food(('apple', 'яблок', 'яблочк'), 52, 0.3, 14, 0.2, 180, 180),
+    Food(('orange', 'апельсин'), 47, 0.9, 12, 0.1, 150, 150),
+    Food(('pear', 'груш'), 57, 0.4, 15, 0.1, 170, 170),
+    Food(('grape', 'виноград'), 69, 0.7, 18, 0.2, None, 150),
+    Food(('avocado', 'авокадо'), 160, 2, 9, 15, 150, 150),
+    Food(('cucumber', 'огурц', 'огурец'), 15, 0.7, 3.6, 0.1, 120, 120),
+    Food(('tomato', 'томат', 'помидор'), 18, 0.9, 3.9, 0.2, 120, 120),
+    Food(('carrot', 'морков'), 41, 0.9, 10, 0.2, 70, 70),
+    Food(('potato', 'картофел', 'картошк', 'картошек'), 87, 1.9, 20, 0.1, 150, 200),
+    Food(('bread', 'хлеб'), 265, 9, 49, 3.2, 30, 30),
+    Food(('rice', 'рис'), 130, 2.7, 28, 0.3, None, 150),
+    Food(('buckwheat', 'греч', 'гречк'), 92, 3.4, 20, 0.6, None, 150),
+    Food(('oatmeal', 'porridge', 'овсянк', 'овсян каш'), 68, 2.4, 12, 1.4, None, 250),
+    Food(('pasta', 'spaghetti', 'макарон', 'спагетти', 'паст'), 158, 5.8, 31, 0.9, None, 200),
+    Food(('pancake', 'блин', 'блинчик', 'оладь', 'олад'), 227, 6, 28, 10, 40, 120),
+    Food(('сырник',), 225, 13, 18, 11, 50, 150),
+    Food(('dumpling', 'пельмен'), 275, 12, 29, 12, 12, 200),
+    Food(('pizza', 'пицц'), 266, 11, 33, 10, 110, 220),
+    Food(('burger', 'hamburger', 'бургер', 'гамбургер'), 295, 17, 24, 14, 200, 200),
+    Food(('chicken breast', 'курин грудк', 'грудк'), 165, 31, 0, 3.6, None, 150),
+    Food(('chicken', 'куриц', 'курятин'), 239, 27, 0, 14, None, 150),
+    Food(('beef', 'говядин'), 250, 26, 0, 15, None, 150),
+    Food(('pork', 'свинин'), 242, 27, 0, 14, None, 150),
+    Food(('salmon', 'лосос', 'семг'), 208, 20, 0, 13, None, 150),
+    Food(('fish', 'рыб'), 140, 22, 0, 5, None, 150),
+    Food(('sausage', 'сосиск', 'колбас'), 260, 11, 1.6, 23, 50, 100),
+    Food(('cheese', 'сыр'), 350, 25, 2, 27, 20, 40),
+    Food(('cottage cheese', 'творог', 'творож'), 121, 17, 1.8, 5, None, 150),
+    Food(('butter', 'сливочн масл'), 717, 0.9, 0.1, 81, None, 10),
+    Food(('olive oil', 'oil', 'оливков масл', 'растительн масл'), 884, 0, 0, 100, None, 15),
+    Food(('milk', 'молок'), 60, 3.2, 4.7, 3.2, 250, 250),
+    Food(('kefir', 'кефир'), 51, 3, 4, 2.5, 250, 250),
+    Food(('yogurt', 'yoghurt', 'йогурт'), 61, 3.5, 4.7, 3.3, 125, 125),
+    Food(('juice', 'сок'), 45, 0.7, 10, 0.2, 250, 250),
+    Food(('coffee', 'кофе'), 2, 0.1, 0, 0, 250, 250),
+    Food(('tea', 'чай', 'чая', 'чаю', 'чаем'), 1, 0, 0.2, 0, 250, 250),
+    Food(('beer', 'пив'), 43, 0.5, 3.6, 0, 500, 500),
+    Food(('wine', 'вин'), 83, 0.1, 2.6, 0, 150, 150),
+    Food(('sugar', 'сахар'), 387, 0, 100, 0, 5, 5),
+    Food(('honey', 'мед', 'меда', 'медом'), 304, 0.3, 82, 0, 20, 20),
+    Food(('chocolate', 'шоколад'), 546, 4.9, 61, 31, 25, 25),
+    Food(('cookie', 'печенье', 'печенья', 'печений'), 480, 6, 65, 22, 15, 45),
+    Food(('nut', 'орех', 'орешк'), 607, 20, 21, 54, None, 30),
+)
@@ -0,0 +1,81 @@
+"""Incremental parsing of a JSON object generated token by token."""
+
+import json
+
+
+class JSONObjectStream:
+    """Collects the top-level fields of a JSON object from text chunks.
+
+    Every field is decoded as soon as the comma or brace after it arrives,
+    so the caller can stop the generation once the fields it needs are
+    known, without waiting for the model to finish.
+    """
+
+    def __init__(self, required: tuple[str, ...] = ()) -> None:
+        """Create a parser waiting for an object.
+
+        Args:
+            required (tuple[str, ...]): fields after which the rest is not needed,
+                if empty the whole object is waited for.
+        """
+        self.required = frozenset(required)
+        self.fields: dict = {}
+        self.complete = False
+        self._text = ''
+        self._position = 0
+        self._member_start: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> dict | None:
+        """Add the next part of the generated text.
+
+        Args:
+            chunk (str): generated text.
+
+        Returns:
+            dict | None: fields decoded so far once the object is complete or all
+            required fields are known, otherwise None.
+
+        Raises:
+            ValueError: If a field is not valid JSON.
+        """
+        self._text += chunk
+        while self._position < len(self._text) and not self.complete:
+            self._step(self._text[self._position])
+            self._position += 1
+        if self.complete or (self.required and self.required <= self.fields.keys()):
+            return self.fields
+        return None
+
+    def _step(self, char):
+        if self._member_start is None:
+            if char == '{':
+                self._depth = 1
+                self._member_start = self._position + 1
+            return
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == '\\':
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            self._in_string = True
+        elif char in '{[':
+            self._depth += 1
+        elif char in '}]':
+            self._depth -= 1
+            if not self._depth:
+                self._finish_member()
+                self.complete = True
+        elif char == ',' and self._depth == 1:
+            self._finish_member()
+            self._member_start = self._position + 1
+
+    def _finish_member(self):
+        member = self._text[self._member_start:self._position].strip()
+        if member:
+            self.fields.update(json.loads(f'{{{member}}}'))
@@ -1,12 +1,24 @@
 """Class with NutritionProviderImpl."""
 
 import json
+import logging
+import threading
+import time
+from typing import Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from lib import config
+from lib.datasources.providers import endpoints
+from lib.datasources.providers.endpoints import EndpointPool, parse_urls
+from lib.datasources.providers.json_stream import JSONObjectStream
 from lib.service.interfaces import nutrition
 
+PROMPT_VERSION = '1'
+RECOMMENDATIONS_PROMPT_VERSION = '1'
+NUTRITION_FIELDS = ('kilocalories', 'proteins', 'carbs', 'fats')
+
 GET_CALORIES_PROMPT = r"""
 You are a smart diet app.
 User gives you a description of his meal and you give him the amount of
@@ -20,6 +32,20 @@ You can give a reasonable average estimate. If there is some real error
 Input: "[[INPUT]]"
 """
 
+GET_CALORIES_BATCH_PROMPT = r"""
+You are a smart diet app.
+User gives you a JSON array with descriptions of several meals and you give
+him the amount of kilocalories, proteins, carbohydrates and fats for every meal.
+Use your knowledge about nutrition in food.
+Return ONLY JSON with this format:
+\{"meals": [\{"kilocalories": int, "proteins": int, "carbs": int, "fats": int\}, ...]\}
+with exactly one object for every description, in the same order.
+You can give a reasonable average estimate. If there is some real error
+(like if provided meal is not food), just place 0 for calories of that meal.
+"kilocalories" should only be an integer number. not a string
+Input: [[INPUT]]
+"""
+
 GET_RECOMMENDATIONS_PROMPT = """
 You are a dietologist.
 Provide recommendations for a client who entered some data into a nutrition app.
@@ -42,18 +68,201 @@ class LLMException(Exception):
     """Exception raised when the LLM fails to provide valid nutrition information."""
 
 
+def _optional_float(amount) -> float | None:
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_body(ollama_model: str, prompt: str, keep_alive: str | None, **options) -> str:
+    body = {"model": ollama_model, "prompt": prompt, **options}
+    if keep_alive is not None:
+        # Ollama reads a string as a duration with a unit, a bare number of
+        # seconds such as "-1" has to be sent as a JSON number.
+        try:
+            body["keep_alive"] = int(keep_alive)
+        except ValueError:
+            body["keep_alive"] = keep_alive
+    return json.dumps(body)
+
+
+def nutrition_request_body(
+    ollama_model: str, meal_description: str, stream: bool = False,
+    keep_alive: str | None = None,
+) -> str:
+    """Build the body of the Ollama generate request for a meal estimate.
+
+    Args:
+        ollama_model (str): The model name to be used for generating responses.
+        meal_description (str): The description of the meal.
+        stream (bool): whether Ollama should send the answer token by token.
+        keep_alive (str | None): how long Ollama keeps the model loaded after
+            the request, a duration such as "30m" or a number of seconds such
+            as "-1", negative to never unload; None for the server default.
+
+    Returns:
+        str: JSON body for /api/generate.
+    """
+    prompt = GET_CALORIES_PROMPT.replace("[[INPUT]]", meal_description)
+    return _request_body(ollama_model, prompt, keep_alive, stream=stream, format="json")
+
+
+def parse_nutrition_response(payload: dict) -> nutrition.NutritionInfo:
+    """Extract nutrition information from the Ollama generate response.
+
+    Args:
+        payload (dict): decoded JSON response of /api/generate.
+
+    Returns:
+        NutritionInfo: The nutritional information of the meal.
+
+    Raises:
+        LLMException: If the LLM fails to provide valid nutrition information.
+    """
+    return _nutrition_from_json(json.loads(payload["response"]))
+
+
+def nutrition_batch_request_body(
+    ollama_model: str, meal_descriptions: list[str], keep_alive: str | None = None,
+) -> str:
+    """Build the body of the Ollama generate request for several meal estimates.
+
+    Args:
+        ollama_model (str): The model name to be used for generating responses.
+        meal_descriptions (list[str]): descriptions of the meals.
+        keep_alive (str | None): how long Ollama keeps the model loaded after the request.
+
+    Returns:
+        str: JSON body for /api/generate.
+    """
+    prompt = GET_CALORIES_BATCH_PROMPT.replace(
+        "[[INPUT]]", json.dumps(meal_descriptions, ensure_ascii=False),
+    )
+    return _request_body(ollama_model, prompt, keep_alive, stream=False, format="json")
+
+
+def parse_nutrition_batch_response(
+    payload: dict, expected: int,
+) -> list[nutrition.NutritionInfo | LLMException]:
+    """Extract nutrition information of several meals from the Ollama generate response.
+
+    Args:
+        payload (dict): decoded JSON response of /api/generate.
+        expected (int): number of meals in the request.
+
+    Returns:
+        list[NutritionInfo | LLMException]: estimates in the order of the request,
+        an exception in place of every meal the LLM did not recognize.
+
+    Raises:
+        LLMException: If the answer does not contain one estimate per meal.
+    """
+    parsed = json.loads(payload["response"])
+    if not isinstance(parsed, dict):
+        raise LLMException('LLM did not return a JSON object')
+    meals = parsed.get("meals")
+    if not isinstance(meals, list) or len(meals) != expected:
+        raise LLMException('LLM returned a wrong number of estimates')
+    estimates = []
+    for meal in meals:
+        try:
+            estimates.append(_nutrition_from_json(meal))
+        except (LLMException, KeyError, TypeError, ValueError) as err:
+            estimates.append(LLMException(str(err)))
+    return estimates
+
+
+def _nutrition_from_json(resp: dict) -> nutrition.NutritionInfo:
+    calories = resp["kilocalories"]
+    if calories == 0:
+        raise LLMException()
+    return nutrition.NutritionInfo(
+        calories=float(calories),
+        proteins=_optional_float(resp.get("proteins")),
+        carbs=_optional_float(resp.get("carbs")),
+        fats=_optional_float(resp.get("fats")),
+    )
+
+
+def recommendations_request_body(
+    ollama_model: str, past_data: list[nutrition.NutritionInfo | None], stream: bool = False,
+    keep_alive: str | None = None,
+) -> str:
+    """Build the body of the Ollama generate request for recommendations.
+
+    Args:
+        ollama_model (str): The model name to be used for generating responses.
+        past_data (list[NutritionInfo | None]): A list of past nutritional information.
+        stream (bool): whether Ollama should send the answer token by token.
+        keep_alive (str | None): how long Ollama keeps the model loaded after the request.
+
+    Returns:
+        str: JSON body for /api/generate.
+    """
+    prompt = GET_RECOMMENDATIONS_PROMPT.replace(
+        '[[INPUT]]', str(
+            [inform.known_values() if inform is not None else None for inform in past_data],
+        ),
+    )
+    return _request_body(ollama_model, prompt, keep_alive, stream=stream)
+
+
 class NutritionProviderImpl(nutrition.NutritionProvider):
     """Implementation of the NutritionProvider interface using a LLM."""
 
-    def __init__(self, ollama_url: str, ollama_model: str) -> None:
+    def __init__(
+        self, ollama_url: str | list[str], ollama_model: str,
+        pool_connections: int = config.OLLAMA_POOL_CONNECTIONS,
+        pool_maxsize: int = config.OLLAMA_POOL_MAXSIZE,
+        health_interval: float = config.OLLAMA_HEALTH_INTERVAL,
+        stream_nutrition: bool = False,
+        keep_alive: str | None = None,
+        ping_interval: float = config.OLLAMA_PING_INTERVAL,
+    ) -> None:
         """Initialize the NutritionProviderImpl.
 
+        Requests to the LLM API go through one keep-alive session, so TCP
+        connections are reused between meals instead of opened per call.
+        With several nodes every request goes to the least busy one.
+
         Args:
-            ollama_url (str): The URL of the LLM API.
+            ollama_url (str | list[str]): The URL of the LLM API, several URLs
+                separated by commas or a list for load balancing.
             ollama_model (str): The model name to be used for generating responses.
+            pool_connections (int): number of hosts to keep connection pools for.
+            pool_maxsize (int): maximum number of connections kept open to one host;
+                callers wait for a free connection when all of them are busy.
+            health_interval (float): seconds between health checks of the nodes,
+                0 to check only by the outcome of requests.
+            stream_nutrition (bool): read meal estimates token by token and stop
+                the generation as soon as all NUTRITION_FIELDS are known.
+            keep_alive (str | None): how long Ollama keeps the model loaded after
+                every request, a duration such as "30m" or a number of seconds such
+                as "-1", negative to never unload; None for the server default.
+            ping_interval (float): seconds without requests after which the model is
+                loaded again with warm_up(), 0 to never ping.
         """
-        self.ollama_url = ollama_url
+        self.endpoints = EndpointPool(parse_urls(ollama_url))
         self.ollama_model = ollama_model
+        self.stream_nutrition = stream_nutrition
+        self.keep_alive = keep_alive
+        self.last_request = time.monotonic()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._closed = threading.Event()
+        if health_interval and len(self.endpoints.endpoints) > 1:
+            threading.Thread(
+                target=self._check_health_forever, args=(health_interval,), daemon=True,
+            ).start()
+        if ping_interval:
+            threading.Thread(
+                target=self._keep_warm_forever, args=(ping_interval,), daemon=True,
+            ).start()
 
     def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
         """Get the nutritional information for a given meal description.
@@ -67,18 +276,13 @@ class NutritionProviderImpl(nutrition.NutritionProvider):
         Raises:
             LLMException: If the LLM fails to provide valid nutrition information.
         """
-        prompt = GET_CALORIES_PROMPT.replace("[[INPUT]]", meal_description)
-        body = json.dumps(
-            {"model": self.ollama_model, "prompt": prompt, "stream": False, "format": "json"},
-        )
-        request = requests.post(
-            f'{self.ollama_url}/api/generate', data=body, timeout=config.TIMEOUT,
+        if self.stream_nutrition:
+            return self._stream_nutrition(meal_description)
+        return parse_nutrition_response(
+            self._generate(nutrition_request_body(
+                self.ollama_model, meal_description, keep_alive=self.keep_alive,
+            )),
         )
-        resp = json.loads(request.json()["response"])
-        calories = resp["kilocalories"]
-        if calories == 0:
-            raise LLMException()
-        return nutrition.NutritionInfo(calories=float(calories))
 
     def get_recommendations(self, past_data: list[nutrition.NutritionInfo]) -> str:
         """Provide dietary recommendations based on past nutrition data.
@@ -89,13 +293,159 @@ class NutritionProviderImpl(nutrition.NutritionProvider):
         Returns:
             str: The dietary recommendations.
         """
-        prompt = GET_RECOMMENDATIONS_PROMPT.replace(
-            '[[INPUT]]', str(
-                [inform.__dict__ if inform is not None else None for inform in past_data],
-            ),
+        payload = self._generate(
+            recommendations_request_body(self.ollama_model, past_data, keep_alive=self.keep_alive),
+            endpoints.RECOMMENDATIONS,
         )
-        body = json.dumps({"model": self.ollama_model, "prompt": prompt, "stream": False})
-        request = requests.post(
-            f'{self.ollama_url}/api/generate', data=body, timeout=config.TIMEOUT,
+        return payload["response"]
+
+    def stream_recommendations(
+        self, past_data: list[nutrition.NutritionInfo | None],
+    ) -> Iterator[str]:
+        """Relay recommendations token by token as Ollama generates them.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Yields:
+            str: next part of the dietary recommendations.
+        """
+        with self._endpoint(endpoints.RECOMMENDATIONS_STREAM) as ollama_url:
+            response = self.session.post(
+                f'{ollama_url}/api/generate',
+                data=recommendations_request_body(
+                    self.ollama_model, past_data, stream=True, keep_alive=self.keep_alive,
+                ),
+                timeout=config.TIMEOUT,
+                stream=True,
+            )
+            with response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        return
+
+    def get_nutrition_batch(
+        self, meal_descriptions: list[str],
+    ) -> list[nutrition.NutritionInfo | LLMException]:
+        """Get the nutritional information for several meals with one LLM call.
+
+        Args:
+            meal_descriptions (list[str]): descriptions of the meals.
+
+        Returns:
+            list[NutritionInfo | LLMException]: estimates in the order of descriptions,
+            an exception in place of every meal the LLM did not recognize.
+        """
+        payload = self._generate(
+            nutrition_batch_request_body(
+                self.ollama_model, meal_descriptions, keep_alive=self.keep_alive,
+            ),
+            endpoints.NUTRITION_BATCH,
         )
-        return request.json()["response"]
+        return parse_nutrition_batch_response(payload, len(meal_descriptions))
+
+    def warm_up(self) -> None:
+        """Load the model on every node, so the next request does not wait for it.
+
+        A node that cannot load the model is logged and skipped, the others
+        are still warmed up.
+        """
+        for endpoint in self.endpoints.endpoints:
+            try:
+                response = self.session.post(
+                    f'{endpoint.url}/api/generate',
+                    data=_request_body(self.ollama_model, '', self.keep_alive, stream=False),
+                    timeout=config.TIMEOUT,
+                )
+                response.raise_for_status()
+            except requests.RequestException:
+                logging.exception('Failed to load the model on %s', endpoint.url)
+
+    def stats(self) -> dict:
+        """Get the state of the Ollama nodes.
+
+        Returns:
+            dict: outstanding requests, latency by kind and ejection of every node
+            under "ollama_nodes".
+        """
+        return {'ollama_nodes': self.endpoints.stats()}
+
+    def close(self) -> None:
+        """Stop background threads and close pooled connections to the LLM API."""
+        self._closed.set()
+        self.session.close()
+
+    def _generate(self, body: str, kind: str = endpoints.NUTRITION) -> dict:
+        with self._endpoint(kind) as ollama_url:
+            response = self.session.post(
+                f'{ollama_url}/api/generate', data=body, timeout=config.TIMEOUT,
+            )
+            response.raise_for_status()
+            return response.json()
+
+    def _stream_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        # Only the node's failures are raised inside the endpoint block, an
+        # unusable answer must not eject a node that is working.
+        parser = JSONObjectStream(required=NUTRITION_FIELDS)
+        fields = None
+        invalid = None
+        with self._endpoint() as ollama_url:
+            response = self.session.post(
+                f'{ollama_url}/api/generate',
+                data=nutrition_request_body(
+                    self.ollama_model, meal_description, stream=True, keep_alive=self.keep_alive,
+                ),
+                timeout=config.TIMEOUT,
+                stream=True,
+            )
+            with response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    try:
+                        fields = parser.feed(chunk.get("response", ""))
+                    except ValueError as err:
+                        invalid = err
+                        break
+                    if fields is not None or chunk.get("done"):
+                        break
+        if invalid is not None:
+            raise LLMException(f'LLM returned invalid JSON: {invalid}') from invalid
+        if fields is None:
+            raise LLMException('LLM did not return a complete estimate')
+        try:
+            return _nutrition_from_json(fields)
+        except (KeyError, TypeError, ValueError) as err:
+            raise LLMException(f'LLM returned an invalid estimate: {err}') from err
+
+    def _endpoint(self, kind: str = endpoints.NUTRITION):
+        self.last_request = time.monotonic()
+        return self.endpoints.request(kind)
+
+    def _is_healthy(self, ollama_url: str) -> bool:
+        try:
+            return self.session.get(f'{ollama_url}/api/tags', timeout=config.TIMEOUT).ok
+        except requests.RequestException:
+            return False
+
+    def _check_health_forever(self, interval: float):
+        while not self._closed.wait(interval):
+            self.endpoints.probe(self._is_healthy)
+
+    def _keep_warm_forever(self, interval: float):
+        while not self._closed.wait(interval):
+            self._ping_if_idle(interval)
+
+    def _ping_if_idle(self, interval: float):
+        if time.monotonic() - self.last_request < interval:
+            return
+        self.warm_up()
+        self.last_request = time.monotonic()
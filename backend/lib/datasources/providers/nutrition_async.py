@@ -0,0 +1,93 @@
+"""Class with AsyncNutritionProviderImpl."""
+
+import aiohttp
+
+from lib import config
+from lib.datasources.providers import endpoints
+from lib.datasources.providers.endpoints import EndpointPool, parse_urls
+from lib.datasources.providers.nutrition import (
+    nutrition_request_body,
+    parse_nutrition_response,
+    recommendations_request_body,
+)
+from lib.service.interfaces import nutrition
+
+
+class AsyncNutritionProviderImpl(nutrition.AsyncNutritionProvider):
+    """Implementation of the AsyncNutritionProvider interface using a LLM."""
+
+    def __init__(
+        self, ollama_url: str | list[str], ollama_model: str,
+        pool_connections: int = config.OLLAMA_POOL_CONNECTIONS,
+        pool_maxsize: int = config.OLLAMA_POOL_MAXSIZE,
+        keep_alive: str | None = None,
+    ) -> None:
+        """Initialize the AsyncNutritionProviderImpl.
+
+        Args:
+            ollama_url (str | list[str]): The URL of the LLM API, several URLs
+                separated by commas or a list for load balancing.
+            ollama_model (str): The model name to be used for generating responses.
+            pool_connections (int): number of hosts to keep connection pools for.
+            pool_maxsize (int): maximum number of connections kept open to one host.
+            keep_alive (str | None): how long Ollama keeps the model loaded after
+                every request; None for the server default.
+        """
+        self.endpoints = EndpointPool(parse_urls(ollama_url))
+        self.ollama_model = ollama_model
+        self.keep_alive = keep_alive
+        self._connection_limit = pool_connections * pool_maxsize
+        self._connection_limit_per_host = pool_maxsize
+        self._session: aiohttp.ClientSession | None = None
+
+    async def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information for a given meal description.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        payload = await self._generate(
+            nutrition_request_body(
+                self.ollama_model, meal_description, keep_alive=self.keep_alive,
+            ),
+        )
+        return parse_nutrition_response(payload)
+
+    async def get_recommendations(self, past_data: list[nutrition.NutritionInfo | None]) -> str:
+        """Provide dietary recommendations based on past nutrition data.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Returns:
+            str: The dietary recommendations.
+        """
+        payload = await self._generate(
+            recommendations_request_body(
+                self.ollama_model, past_data, keep_alive=self.keep_alive,
+            ),
+            endpoints.RECOMMENDATIONS,
+        )
+        return payload["response"]
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _generate(self, body: str, kind: str = endpoints.NUTRITION) -> dict:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._connection_limit, limit_per_host=self._connection_limit_per_host,
+                ),
+                timeout=aiohttp.ClientTimeout(total=config.TIMEOUT),
+            )
+        with self.endpoints.request(kind) as ollama_url:
+            async with self._session.post(f'{ollama_url}/api/generate', data=body) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
@@ -0,0 +1,101 @@
+"""File with BatchingNutritionProvider."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from lib import config
+from lib.datasources.providers.nutrition import LLMException, NutritionProviderImpl
+from lib.datasources.providers.nutrition_wrapper import NutritionProviderWrapper
+from lib.service.interfaces import nutrition
+
+
+class BatchingNutritionProvider(NutritionProviderWrapper):
+    """Provider that estimates meals arriving close in time with one LLM call.
+
+    A collector thread waits for the first meal, then gathers more meals for
+    at most ``max_latency`` seconds or until ``max_batch_size`` is reached and
+    sends them as one prompt. Every caller still gets only its own estimate.
+    If the LLM answers a batch with something unusable, meals of that batch
+    are estimated one by one.
+    """
+
+    def __init__(
+        self, provider: NutritionProviderImpl,
+        max_batch_size: int = config.NUTRITION_BATCH_SIZE,
+        max_latency: float = config.NUTRITION_BATCH_LATENCY,
+        max_concurrent_batches: int = config.NUTRITION_BATCH_WORKERS,
+    ) -> None:
+        """Wrap a provider and start the collector thread.
+
+        Args:
+            provider (NutritionProviderImpl): provider that supports get_nutrition_batch.
+            max_batch_size (int): maximum number of meals in one LLM call.
+            max_latency (float): seconds the first meal of a batch waits for others.
+            max_concurrent_batches (int): number of batches sent to the LLM at once.
+        """
+        super().__init__(provider)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._pending: queue.Queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix='nutrition-batch',
+        )
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information as part of the next batch.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        future = Future()
+        self._pending.put((meal_description, future))
+        return future.result()
+
+    def _collect(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._estimate, batch)
+
+    def _estimate(self, batch):
+        descriptions = [description for description, _ in batch]
+        try:
+            estimates = self._estimate_descriptions(descriptions)
+        except BaseException as err:
+            for _, future in batch:
+                future.set_exception(err)
+            return
+        for (_, future), estimate in zip(batch, estimates):
+            if isinstance(estimate, Exception):
+                future.set_exception(estimate)
+            else:
+                future.set_result(estimate)
+
+    def _estimate_descriptions(self, descriptions):
+        if len(descriptions) > 1:
+            try:
+                return self.provider.get_nutrition_batch(descriptions)
+            except (LLMException, KeyError, TypeError, ValueError):
+                pass  # noqa: WPS420
+        estimates = []
+        for description in descriptions:
+            try:
+                estimates.append(self.provider.get_nutrition(description))
+            except Exception as err:
+                estimates.append(err)
+        return estimates
@@ -0,0 +1,124 @@
+"""File with CachedNutritionProvider and PersistentCachedNutritionProvider."""
+
+import threading
+
+from lib import config
+from lib.database.estimate_cache import BaseEstimateRepository
+from lib.datasources.providers.nutrition_wrapper import NutritionProviderWrapper
+from lib.service.cache import LRUCache
+from lib.service.interfaces import nutrition
+from lib.service.normalization import normalize_description
+
+
+class CachedNutritionProvider(NutritionProviderWrapper):
+    """Provider that remembers estimates of recently logged meals.
+
+    Estimates are keyed on the normalized description, so repeated meals
+    are answered from memory instead of the LLM. Failures are not cached.
+    """
+
+    def __init__(
+        self, provider: nutrition.NutritionProvider,
+        maxsize: int = config.NUTRITION_CACHE_SIZE,
+        ttl: float = config.NUTRITION_CACHE_TTL,
+    ) -> None:
+        """Wrap a provider with a cache.
+
+        Args:
+            provider (nutrition.NutritionProvider): provider that does the actual work.
+            maxsize (int): maximum number of cached descriptions.
+            ttl (float): seconds after which a cached estimate expires.
+        """
+        super().__init__(provider)
+        self.cache = LRUCache(maxsize, ttl)
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information from the cache or the wrapped provider.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        key = normalize_description(meal_description)
+        nutrition_info = self.cache.get(key)
+        if nutrition_info is None:
+            nutrition_info = self.provider.get_nutrition(meal_description)
+            self.cache.put(key, nutrition_info)
+        return nutrition_info
+
+    def stats(self) -> dict:
+        """Get counters of the cache and the wrapped providers.
+
+        Returns:
+            dict: hits, misses and size of the cache under "nutrition_cache".
+        """
+        return {**self.provider.stats(), 'nutrition_cache': self.cache.stats()}
+
+
+class PersistentCachedNutritionProvider(NutritionProviderWrapper):
+    """Provider that shares estimates between restarts and replicas through the database.
+
+    Estimates are keyed on the normalized description, the model and the
+    prompt version, so changing either of them does not return stale answers.
+    Database errors only turn a hit into a miss.
+    """
+
+    def __init__(
+        self, provider: nutrition.NutritionProvider,
+        estimate_repository: BaseEstimateRepository,
+        model: str, prompt_version: str,
+    ) -> None:
+        """Wrap a provider with a persistent cache.
+
+        Args:
+            provider (nutrition.NutritionProvider): provider that does the actual work.
+            estimate_repository (BaseEstimateRepository): storage of estimates.
+            model (str): name of the model used by the wrapped provider.
+            prompt_version (str): version of the prompt used by the wrapped provider.
+        """
+        super().__init__(provider)
+        self.estimate_repository = estimate_repository
+        self.model = model
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information from the database or the wrapped provider.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        key = normalize_description(meal_description)
+        nutrition_info = self.estimate_repository.get_estimate(
+            key, self.model, self.prompt_version,
+        )
+        hit = isinstance(nutrition_info, nutrition.NutritionInfo)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            return nutrition_info
+        nutrition_info = self.provider.get_nutrition(meal_description)
+        self.estimate_repository.save_estimate(
+            key, self.model, self.prompt_version, nutrition_info,
+        )
+        return nutrition_info
+
+    def stats(self) -> dict:
+        """Get counters of the database cache and the wrapped providers.
+
+        Returns:
+            dict: hits and misses of the database under "nutrition_persistent_cache".
+        """
+        with self._lock:
+            counters = {'hits': self.hits, 'misses': self.misses}
+        return {**self.provider.stats(), 'nutrition_persistent_cache': counters}
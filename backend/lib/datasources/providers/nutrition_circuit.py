@@ -0,0 +1,88 @@
+"""File with CircuitBreakerNutritionProvider."""
+
+from typing import Iterator
+
+from lib.datasources.providers.nutrition_wrapper import NutritionProviderWrapper
+from lib.service.circuit_breaker import CircuitBreaker
+from lib.service.interfaces import nutrition
+
+
+class CircuitBreakerNutritionProvider(NutritionProviderWrapper):
+    """Provider that fails fast with CircuitOpenError while the LLM keeps failing.
+
+    Meal estimates and recommendations go through separate circuits, so a
+    recommendation that takes long to write does not count as a slow call
+    and make meal estimates fail fast.
+    """
+
+    def __init__(
+        self, provider: nutrition.NutritionProvider, breaker: CircuitBreaker,
+        recommendations_breaker: CircuitBreaker,
+    ) -> None:
+        """Wrap a provider.
+
+        Args:
+            provider (nutrition.NutritionProvider): provider that does the actual work.
+            breaker (CircuitBreaker): circuit for meal estimates.
+            recommendations_breaker (CircuitBreaker): circuit for recommendations.
+        """
+        super().__init__(provider)
+        self.breaker = breaker
+        self.recommendations_breaker = recommendations_breaker
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information unless the circuit is open.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        with self.breaker.protect():
+            return self.provider.get_nutrition(meal_description)
+
+    def get_recommendations(self, past_data: list[nutrition.NutritionInfo | None]) -> str:
+        """Get recommendations unless the circuit is open.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Returns:
+            str: The dietary recommendations.
+        """
+        with self.recommendations_breaker.protect():
+            return self.provider.get_recommendations(past_data)
+
+    def stream_recommendations(
+        self, past_data: list[nutrition.NutritionInfo | None],
+    ) -> Iterator[str]:
+        """Stream recommendations unless the circuit is open.
+
+        Only the wait for the first part is timed, since the rest of the
+        stream goes as fast as the client reads it.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Yields:
+            str: next part of the dietary recommendations.
+        """
+        chunks = iter(self.provider.stream_recommendations(past_data))
+        with self.recommendations_breaker.protect():
+            first = next(chunks, None)
+        if first is None:
+            return
+        yield first
+        yield from chunks
+
+    def stats(self) -> dict:
+        """Get the state of both circuits and counters of the wrapped providers.
+
+        Returns:
+            dict: state and failure rate of the circuits under "circuit_breaker".
+        """
+        return {**self.provider.stats(), 'circuit_breaker': {
+            'nutrition': self.breaker.stats(),
+            'recommendations': self.recommendations_breaker.stats(),
+        }}
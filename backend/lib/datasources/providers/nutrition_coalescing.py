@@ -0,0 +1,48 @@
+"""File with CoalescingNutritionProvider."""
+
+from lib.datasources.providers.nutrition_wrapper import NutritionProviderWrapper
+from lib.service.interfaces import nutrition
+from lib.service.normalization import normalize_description
+from lib.service.singleflight import SingleFlight
+from lib.service.stats import past_data_key
+
+
+class CoalescingNutritionProvider(NutritionProviderWrapper):
+    """Provider that shares one upstream call between concurrent identical requests."""
+
+    def __init__(self, provider: nutrition.NutritionProvider) -> None:
+        """Wrap a provider.
+
+        Args:
+            provider (nutrition.NutritionProvider): provider that does the actual work.
+        """
+        super().__init__(provider)
+        self.nutrition_calls = SingleFlight()
+        self.recommendation_calls = SingleFlight()
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information, joining an identical request in flight.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        return self.nutrition_calls.do(
+            normalize_description(meal_description),
+            self.provider.get_nutrition, meal_description,
+        )
+
+    def get_recommendations(self, past_data: list[nutrition.NutritionInfo | None]) -> str:
+        """Get recommendations, joining a request for the same data in flight.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Returns:
+            str: The dietary recommendations.
+        """
+        return self.recommendation_calls.do(
+            past_data_key(past_data), self.provider.get_recommendations, past_data,
+        )
@@ -0,0 +1,148 @@
+"""Class with OfflineNutritionEstimator."""
+
+import re
+
+from lib.datasources.providers.food_table import FOODS, Food
+from lib.service.interfaces import nutrition
+from lib.service.normalization import split_ingredients
+from lib.service.stem_trie import StemTrie
+
+SERVING_CONFIDENCE = 0.6
+UNMATCHED_PENALTY = 0.5
+
+_TOKEN = re.compile(r'\d+(?:[.,]\d+)?|[^\W\d_]+')
+_NUMBERS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'half': 0.5,
+    'один': 1, 'одна': 1, 'одно': 1, 'два': 2, 'две': 2, 'три': 3, 'четыре': 4, 'пять': 5,
+    'пол': 0.5, 'половина': 0.5, 'половинка': 0.5,
+}
+# Grams in one unit, None for units that mean one piece of the food.
+_UNITS = {
+    **dict.fromkeys(('g', 'gr', 'gram', 'grams', 'г', 'гр', 'грамм', 'грамма', 'граммов'), 1),
+    **dict.fromkeys(('ml', 'мл'), 1),
+    **dict.fromkeys(('kg', 'кг', 'l', 'л', 'литр', 'литра', 'литров'), 1000),
+    **dict.fromkeys(('tbsp', 'ложка', 'ложки', 'ложек'), 15),
+    **dict.fromkeys(('tsp',), 5),
+    **dict.fromkeys((
+        'pc', 'pcs', 'piece', 'pieces', 'шт', 'штука', 'штуки', 'штук',
+        'cup', 'cups', 'glass', 'glasses', 'стакан', 'стакана', 'стаканов',
+        'чашка', 'чашки', 'чашек', 'кружка', 'кружки', 'кружек',
+        'slice', 'slices', 'ломтик', 'ломтика', 'ломтиков', 'кусок', 'куска', 'кусочек',
+        'кусочка', 'кусков',
+    ), None),
+}
+_SKIPPED = frozenset(('of', 'из'))
+_ENGLISH_ENDINGS = frozenset(('', 's', 'es'))
+_NOUN_ENDINGS = frozenset((
+    '', 'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'ой', 'ей', 'ом', 'ем', 'ам', 'ям',
+    'ами', 'ями', 'ах', 'ях', 'ов', 'ев', 'ью', 'ья', 'ьи', 'ье', 'ьев',
+))
+_ADJECTIVE_ENDINGS = frozenset((
+    'ый', 'ий', 'ой', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ого', 'его', 'ому', 'ему',
+    'ую', 'юю', 'ых', 'их', 'ым', 'им', 'ом', 'ем', 'ыми', 'ими',
+))
+
+
+def _endings(stem: str, last: bool) -> frozenset[str]:
+    if stem.isascii():
+        return _ENGLISH_ENDINGS
+    return _NOUN_ENDINGS if last else _ADJECTIVE_ENDINGS
+
+
+class OfflineNutritionEstimator:
+    """Estimates simple meals from the bundled food table without calling the LLM.
+
+    A description is split into ingredients, every ingredient into an
+    amount, a unit and food words. Food words are matched against the table
+    through a StemTrie, so inflected Russian forms are found as well. The
+    last word of a Russian name takes noun endings, the words before it
+    adjective endings.
+
+    An ingredient without an amount or a unit gets at most
+    SERVING_CONFIDENCE, since its usual serving is only a guess.
+
+    It is not a NutritionProvider: it cannot give recommendations and it
+    does not know most meals, so it is only used by RoutingNutritionProvider.
+    """
+
+    def __init__(self, foods: tuple[Food, ...] = FOODS) -> None:
+        """Index the food table.
+
+        Args:
+            foods (tuple[Food, ...]): foods that can be recognized.
+        """
+        self.stems = StemTrie()
+        self.foods: dict[tuple[str, ...], Food] = {}
+        for food in foods:
+            for name in food.names:
+                words = tuple(name.split())
+                self.foods[words] = food
+                for position, word in enumerate(words, 1):
+                    self.stems.add(word, _endings(word, last=position == len(words)))
+        self.longest_name = max(len(words) for words in self.foods)
+
+    def estimate(self, meal_description: str) -> tuple[nutrition.NutritionInfo, float] | None:
+        """Estimate a meal and say how sure the estimate is.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            tuple[NutritionInfo, float] | None: the estimate and confidence from 0 to 1,
+            None if some ingredient is not in the table.
+        """
+        total = nutrition.NutritionInfo(calories=0, proteins=0, carbs=0, fats=0)
+        confidence = 1.0
+        ingredients = split_ingredients(meal_description)
+        if not ingredients:
+            return None
+        for ingredient in ingredients:
+            found = self._estimate_ingredient(ingredient)
+            if found is None:
+                return None
+            grams, food, ingredient_confidence = found
+            total.calories += food.calories * grams / 100
+            total.proteins += food.proteins * grams / 100
+            total.carbs += food.carbs * grams / 100
+            total.fats += food.fats * grams / 100
+            confidence = min(confidence, ingredient_confidence)
+        return nutrition.NutritionInfo(
+            calories=round(total.calories, 1),
+            proteins=round(total.proteins, 1),
+            carbs=round(total.carbs, 1),
+            fats=round(total.fats, 1),
+        ), confidence
+
+    def _estimate_ingredient(self, ingredient):
+        amount = None
+        unit = False
+        words = []
+        for token in _TOKEN.findall(ingredient):
+            if token[0].isdigit() and amount is None:
+                amount = float(token.replace(',', '.'))
+            elif token in _NUMBERS and amount is None:
+                amount = _NUMBERS[token]
+            elif token in _UNITS and unit is False:
+                unit = _UNITS[token]
+            elif token not in _SKIPPED:
+                words.append(token)
+        food, matched = self._find_food(words)
+        if food is None:
+            return None
+        confidence = 1.0 if matched == len(words) else UNMATCHED_PENALTY
+        if (food.piece is None and not unit) or (amount is None and unit is False):
+            confidence = min(confidence, SERVING_CONFIDENCE)
+        if unit:
+            return (amount or 1) * unit, food, confidence
+        if unit is None or amount is not None:
+            return (amount or 1) * (food.piece or food.serving), food, confidence
+        return food.serving, food, confidence
+
+    def _find_food(self, words):
+        stems = [self.stems.longest(word) for word in words]
+        for length in range(min(self.longest_name, len(stems)), 0, -1):
+            for start in range(len(stems) - length + 1):
+                food = self.foods.get(tuple(stems[start:start + length]))
+                if food is not None:
+                    return food, length
+        return None, 0
@@ -0,0 +1,50 @@
+"""File with RoutingNutritionProvider."""
+
+from lib import config
+from lib.datasources.providers.nutrition_offline import OfflineNutritionEstimator
+from lib.datasources.providers.nutrition_wrapper import NutritionProviderWrapper
+from lib.service.circuit_breaker import CircuitOpenError
+from lib.service.interfaces import nutrition
+
+
+class RoutingNutritionProvider(NutritionProviderWrapper):
+    """Provider that answers simple meals offline and asks the LLM about the rest.
+
+    While the LLM circuit is open, a less confident offline estimate is
+    returned instead of an error.
+    """
+
+    def __init__(
+        self, provider: nutrition.NutritionProvider,
+        offline_estimator: OfflineNutritionEstimator,
+        min_confidence: float = config.OFFLINE_MIN_CONFIDENCE,
+    ) -> None:
+        """Wrap a provider.
+
+        Args:
+            provider (nutrition.NutritionProvider): LLM provider for meals not in the table.
+            offline_estimator (OfflineNutritionEstimator): estimator with the food table.
+            min_confidence (float): confidence from which offline estimates are used.
+        """
+        super().__init__(provider)
+        self.offline_estimator = offline_estimator
+        self.min_confidence = min_confidence
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Get the nutritional information offline if possible.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        found = self.offline_estimator.estimate(meal_description)
+        if found is not None and found[1] >= self.min_confidence:
+            return found[0]
+        try:
+            return self.provider.get_nutrition(meal_description)
+        except CircuitOpenError:
+            if found is None:
+                raise
+            return found[0]
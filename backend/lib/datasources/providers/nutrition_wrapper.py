@@ -0,0 +1,64 @@
+"""File with NutritionProviderWrapper."""
+
+from typing import Iterator
+
+from lib.service.interfaces import nutrition
+
+
+class NutritionProviderWrapper(nutrition.NutritionProvider):
+    """Base class for providers that add behaviour around another provider.
+
+    Every method is delegated to the wrapped provider, subclasses override
+    only what they change.
+    """
+
+    def __init__(self, provider: nutrition.NutritionProvider) -> None:
+        """Wrap a provider.
+
+        Args:
+            provider (nutrition.NutritionProvider): provider that does the actual work.
+        """
+        self.provider = provider
+
+    def get_nutrition(self, meal_description: str) -> nutrition.NutritionInfo:
+        """Delegate to the wrapped provider.
+
+        Args:
+            meal_description (str): The description of the meal.
+
+        Returns:
+            NutritionInfo: The nutritional information of the meal.
+        """
+        return self.provider.get_nutrition(meal_description)
+
+    def get_recommendations(self, past_data: list[nutrition.NutritionInfo | None]) -> str:
+        """Delegate to the wrapped provider.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Returns:
+            str: The dietary recommendations.
+        """
+        return self.provider.get_recommendations(past_data)
+
+    def stream_recommendations(
+        self, past_data: list[nutrition.NutritionInfo | None],
+    ) -> Iterator[str]:
+        """Delegate to the wrapped provider.
+
+        Args:
+            past_data (list[NutritionInfo | None]): A list of past nutritional information.
+
+        Returns:
+            Iterator[str]: parts of the dietary recommendations.
+        """
+        return self.provider.stream_recommendations(past_data)
+
+    def stats(self) -> dict:
+        """Delegate to the wrapped provider.
+
+        Returns:
+            dict: counters of the wrapped providers.
+        """
+        return self.provider.stats()
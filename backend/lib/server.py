@@ -1,153 +1,342 @@
 """HTTP nutrition server."""
 import datetime
 import json
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import MappingProxyType
 from urllib.parse import parse_qs, urlparse
 
 from lib import config
 from lib.database.session import BaseNutritionRepository
+from lib.service import bulk, jobs, stats
+from lib.service.circuit_breaker import CircuitOpenError
 from lib.service.interfaces import nutrition
+from lib.service.meals import log_meal
+from lib.service.precompute import RecommendationPrecomputer
+from lib.service.recommendation_cache import RecommendationCache
+
+JOBS_PATH = '/api/v1/jobs/'
 
 
 def nutrition_handler_factory(
     nutrition_provider: nutrition.NutritionProvider,
     nutrition_repository: BaseNutritionRepository,
+    recommendation_cache: RecommendationCache | None = None,
+    precomputer: RecommendationPrecomputer | None = None,
+    job_manager: jobs.JobManager | None = None,
 ):
     """Create class NutritionerHandler.
 
     Args:
         nutrition_provider (nutrition.NutritionProvider): class that provides interface.
         nutrition_repository (BaseNutritionRepository): class that provides interface.
+        recommendation_cache (RecommendationCache | None): cache of recommendations,
+            invalidated when a meal of the user is stored.
+        precomputer (RecommendationPrecomputer | None): generates recommendations into
+            recommendation_cache in the background after meals are stored.
+        job_manager (jobs.JobManager | None): runs meals posted in async mode;
+            without it such meals are processed synchronously.
 
     Returns:
         NutritionerHandler: class for HTTP server.
     """
     class NutritionerHandler(SimpleHTTPRequestHandler):
         def do_POST(self):
-            if self.path != '/api/v1/meals':
+            path = urlparse(self.path).path
+            if path == '/api/v1/meals/bulk':
+                self._post_meals_bulk()
+                return
+            if path != '/api/v1/meals':
                 self.send_response(config.NOT_FOUND)
                 self.end_headers()
                 return
+            self._post_meal()
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == '/api/v1/stats/stream':
+                self._get_stats_stream()
+                return
+            if path == '/api/v1/stats':
+                self._get_stats()
+                return
+            if path == '/api/v1/metrics':
+                self._get_metrics()
+                return
+            if path.startswith(JOBS_PATH):
+                self._get_job(path[len(JOBS_PATH):])
+                return
+
+            self.send_response(config.NOT_FOUND)
+            self.end_headers()
+            return
 
+        def _post_meal(self):
             content_length = int(self.headers[config.HEADER_LENGTH])
             body = self.rfile.read(content_length)
             meal_info = json.loads(body)
 
             if 'user_id' not in meal_info or 'description' not in meal_info:
-                self.send_response(config.BAD_REQUEST)
-                self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                self.end_headers()
-                response = {
+                self._send_json(config.BAD_REQUEST, {
                     config.ERROR: 'Invalid request, missing user_id or description',
-                }
-                self.wfile.write(json.dumps(response).encode(config.UTF8))
+                })
                 return
 
             user_id = meal_info['user_id']
             description = meal_info['description']
             created_date = meal_info.get('created_date', datetime.datetime.now())
 
-            try:
-                nutrition_info = nutrition_provider.get_nutrition(meal_description=description)
-            except Exception as err:
-                self.send_response(config.BAD_REQUEST)
-                self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                self.end_headers()
-                response = {
-                    config.ERROR: 'Server did not recognize the request.',
-                    'details': str(err),
-                }
-                self.wfile.write(json.dumps(response).encode(config.UTF8))
+            if job_manager is not None and self._async_requested(meal_info):
+                try:
+                    job = job_manager.submit(
+                        self._log_meal, user_id, description, created_date,
+                        callback_url=meal_info.get('callback_url'),
+                    )
+                except jobs.CallbackNotAllowedError as err:
+                    self._send_json(config.BAD_REQUEST, {config.ERROR: str(err)})
+                    return
+                except jobs.JobQueueFullError as err:
+                    self._send_json(config.SERVICE_UNAVAILABLE, {config.ERROR: str(err)})
+                    return
+                self._send_json(
+                    config.ACCEPTED, job, location=f'{JOBS_PATH}{job["job_id"]}',
+                )
                 return
 
-            response = nutrition_repository.insert_meal(
-                user_id=user_id,
-                description=description,
-                calories=nutrition_info.calories,
-                created_date=created_date,
-            )
+            self._send_json(*self._log_meal(user_id, description, created_date))
 
-            if response['status'] == config.ERROR:
-                self.send_response(config.INTERNAL_SERVER_ERROR)
-                self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                self.end_headers()
-                self.wfile.write(json.dumps(response).encode(config.UTF8))
-                return
-            self.send_response(config.OK)
-            self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-            self.end_headers()
-            response = {"calories": nutrition_info.calories}
-            self.wfile.write(json.dumps(response).encode(config.UTF8))
-
-        def do_GET(self):
-            if self.path.startswith('/api/v1/stats'):
-                query_components = parse_qs(urlparse(self.path).query)
-                user_id = query_components.get('user_id', [None])[0]
-
-                if not user_id:
-                    self.send_response(config.BAD_REQUEST)
-                    self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                    self.end_headers()
-                    response = {config.ERROR: 'Missing user_id parameter'}
-                    self.wfile.write(json.dumps(response).encode(config.UTF8))
-                    return
+        def _log_meal(self, user_id, description, created_date):
+            http_status, response = log_meal(
+                nutrition_provider, nutrition_repository, user_id, description, created_date,
+            )
+            if http_status == config.OK:
+                self._meals_changed([user_id])
+            return http_status, response
 
-                meals = nutrition_repository.get_meals_for_last_week(user_id)
+        def _async_requested(self, meal_info):
+            query_components = parse_qs(urlparse(self.path).query)
+            return (
+                meal_info.get('async') is True
+                or query_components.get('async', ['0'])[0] in {'1', 'true'}
+                or 'respond-async' in self.headers.get('Prefer', '')
+            )
 
-                if isinstance(meals, dict) and meals.get('status') == config.ERROR:
-                    self.send_response(config.INTERNAL_SERVER_ERROR)
-                    self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                    self.end_headers()
-                    self.wfile.write(json.dumps(meals).encode(config.UTF8))
-                    return
+        def _post_meals_bulk(self):
+            content_length = int(self.headers[config.HEADER_LENGTH])
+            body = self.rfile.read(content_length)
+            try:
+                meal_items = bulk.parse_bulk_body(
+                    body, self.headers.get(config.HEADER_TYPE, config.JSON_TYPE),
+                )
+            except bulk.BulkRequestError as err:
+                self._send_json(config.BAD_REQUEST, {config.ERROR: str(err)})
+                return
 
-                if not meals:
-                    self.send_response(config.NOT_FOUND)
-                    self.end_headers()
-                    return
+            outcomes = bulk.ingest_meals(meal_items, nutrition_provider, nutrition_repository)
+            self._meals_changed({
+                meal_item['user_id'] for meal_item, outcome in zip(meal_items, outcomes)
+                if outcome['status'] != config.ERROR
+            })
+            failed = sum(1 for outcome in outcomes if outcome['status'] == config.ERROR)
+            self._send_json(config.OK, {
+                'inserted': len(outcomes) - failed,
+                'failed': failed,
+                'results': outcomes,
+            })
 
-                past_data = [
-                    nutrition.NutritionInfo(
-                        calories=sum(
-                            [
-                                meal.calories for meal in meals if meal.created_date.date()
-                                == datetime.datetime.now().date() - datetime.timedelta(days=day)
-                            ],
-                        ),
-                    ) for day in range(7)
-                ]
-                past_data = [inform if inform.calories else None for inform in past_data]
+        def _get_stats(self):
+            user_id, past_data = self._load_past_data()
+            if past_data is None:
+                return
 
+            recommendations = self._cached_recommendations(user_id, past_data)
+            if recommendations is None:
                 try:
                     recommendations = nutrition_provider.get_recommendations(past_data)
+                except CircuitOpenError as err:
+                    self._send_json(config.SERVICE_UNAVAILABLE, {config.ERROR: str(err)})
+                    return
                 except Exception as err:
-                    self.send_response(config.INTERNAL_SERVER_ERROR)
-                    self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                    self.end_headers()
-                    response = {
+                    self._send_json(config.INTERNAL_SERVER_ERROR, {
                         config.ERROR: 'Error fetching recommendations', 'details': str(err),
-                    }
-                    self.wfile.write(json.dumps(response).encode(config.UTF8))
+                    })
                     return
+                if recommendation_cache is not None:
+                    recommendation_cache.put(user_id, past_data, recommendations)
 
-                self.send_response(config.OK)
-                self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
-                self.end_headers()
-                response = {"recommendations": recommendations}
-                self.wfile.write(json.dumps(response, ensure_ascii=False).encode(config.UTF8))
+            self._send_json(config.OK, {"recommendations": recommendations})
+
+        def _get_stats_stream(self):
+            user_id, past_data = self._load_past_data()
+            if past_data is None:
                 return
 
-            self.send_response(config.NOT_FOUND)
+            self.send_response(config.OK)
+            self.send_header(config.HEADER_TYPE, config.EVENT_STREAM_TYPE)
+            self.send_header('Cache-Control', 'no-cache')
             self.end_headers()
-            return
+            recommendations = self._cached_recommendations(user_id, past_data)
+            if recommendations is not None:
+                self._send_event('message', {'recommendations': recommendations})
+                self._send_event('done', {})
+                return
+            parts = []
+            try:
+                for part in nutrition_provider.stream_recommendations(past_data):
+                    parts.append(part)
+                    self._send_event('message', {'recommendations': part})
+            except Exception as err:
+                self._send_event(config.ERROR, {
+                    config.ERROR: 'Error fetching recommendations', 'details': str(err),
+                })
+                return
+            if recommendation_cache is not None:
+                recommendation_cache.put(user_id, past_data, ''.join(parts))
+            self._send_event('done', {})
+
+        def _get_metrics(self):
+            metrics = {
+                'db_pool': nutrition_repository.get_pool_stats(),
+                'nutrition': nutrition_provider.stats(),
+            }
+            if recommendation_cache is not None:
+                metrics['recommendation_cache'] = recommendation_cache.stats()
+            if precomputer is not None:
+                metrics['precompute'] = precomputer.stats()
+            if job_manager is not None:
+                metrics['jobs'] = job_manager.stats()
+            self._send_json(config.OK, metrics)
+
+        def _get_job(self, job_id):
+            job = job_manager.get(job_id) if job_manager is not None else None
+            if job is None:
+                self._send_json(config.NOT_FOUND, {config.ERROR: 'Unknown job'})
+                return
+            self._send_json(config.OK, job)
+
+        def _load_past_data(self):
+            query_components = parse_qs(urlparse(self.path).query)
+            user_id = query_components.get('user_id', [None])[0]
+
+            if not user_id:
+                self._send_json(config.BAD_REQUEST, {config.ERROR: 'Missing user_id parameter'})
+                return user_id, None
+
+            daily_calories = nutrition_repository.get_daily_calories(user_id)
+
+            if isinstance(daily_calories, dict) and daily_calories.get('status') == config.ERROR:
+                self._send_json(config.INTERNAL_SERVER_ERROR, daily_calories)
+                return user_id, None
+
+            if not daily_calories:
+                self.send_response(config.NOT_FOUND)
+                self.end_headers()
+                return user_id, None
+
+            return user_id, stats.daily_calories_to_past_data(daily_calories)
+
+        def _cached_recommendations(self, user_id, past_data):
+            if recommendation_cache is None:
+                return None
+            return recommendation_cache.get(user_id, past_data)
+
+        def _meals_changed(self, user_ids):
+            for changed_user_id in user_ids:
+                if precomputer is not None:
+                    precomputer.schedule(changed_user_id)
+                elif recommendation_cache is not None:
+                    recommendation_cache.invalidate(changed_user_id)
+
+        def _send_event(self, event: str, payload: dict):
+            data = json.dumps(payload, ensure_ascii=False)
+            self.wfile.write(f'event: {event}\ndata: {data}\n\n'.encode(config.UTF8))
+            self.wfile.flush()
+
+        def _send_json(self, status: int, response: dict, location: str | None = None):
+            self.send_response(status)
+            self.send_header(config.HEADER_TYPE, config.JSON_TYPE)
+            if location is not None:
+                self.send_header('Location', location)
+            self.end_headers()
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode(config.UTF8))
 
     return NutritionerHandler
 
 
+class PooledHTTPServer(ThreadingHTTPServer):
+    """HTTP server that handles requests in a bounded pool of worker threads.
+
+    At most ``max_workers`` requests are processed at once and at most
+    ``queue_size`` more wait for a free worker. Requests beyond that are
+    rejected with 503 instead of piling up behind slow LLM calls.
+    """
+
+    def __init__(
+        self, server_address, handler_class,
+        max_workers: int = config.SERVER_MAX_WORKERS,
+        queue_size: int = config.SERVER_QUEUE_SIZE,
+    ) -> None:
+        """Create the server.
+
+        Args:
+            server_address (tuple): host and port to listen on.
+            handler_class (_type_): request handler class.
+            max_workers (int): number of requests processed concurrently.
+            queue_size (int): number of accepted requests waiting for a worker.
+        """
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='nutritioner',
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+
+    def process_request(self, request, client_address):
+        """Submit the request to the worker pool or reject it if the queue is full.
+
+        Args:
+            request (socket): client connection.
+            client_address (tuple): address of the client.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        future = self._executor.submit(self.process_request_thread, request, client_address)
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def server_close(self):
+        """Close the socket and wait for the worker pool to finish."""
+        super().server_close()
+        self._executor.shutdown(wait=self.block_on_close)
+
+    def _reject(self, request):
+        body = json.dumps({config.ERROR: 'Server is busy, try again later'}).encode(config.UTF8)
+        head = (
+            f'HTTP/1.0 {config.SERVICE_UNAVAILABLE} Service Unavailable\r\n'
+            + f'{config.HEADER_TYPE}: {config.JSON_TYPE}\r\n'
+            + f'{config.HEADER_LENGTH}: {len(body)}\r\n\r\n'
+        )
+        try:
+            request.sendall(head.encode(config.UTF8) + body)
+        except OSError:
+            pass  # noqa: WPS420
+        self.shutdown_request(request)
+
+
+SERVER_CLASSES = MappingProxyType({
+    'single': HTTPServer,
+    'threaded': PooledHTTPServer,
+})
+
+
 def run(
     nutrition_repository: BaseNutritionRepository,
     nutrition_provider: nutrition.NutritionProvider,
     server_class=HTTPServer, port=8000,
+    recommendation_cache: RecommendationCache | None = None,
+    precomputer: RecommendationPrecomputer | None = None,
+    job_manager: jobs.JobManager | None = None,
+    **server_options,
 ):
     """Start the server.
 
@@ -156,10 +345,18 @@ def run(
         nutrition_provider (nutrition.NutritionProvider): class that provides interface.
         server_class (_type_, optional): defaults to HTTPServer.
         port (int, optional): port for server. Defaults to 8000.
+        recommendation_cache (RecommendationCache | None): cache of recommendations.
+        precomputer (RecommendationPrecomputer | None): background generator of recommendations.
+        job_manager (jobs.JobManager | None): runs meals posted in async mode.
+        server_options: extra arguments for server_class, e.g. max_workers
+            and queue_size for PooledHTTPServer.
     """
-    handler_class = nutrition_handler_factory(nutrition_provider, nutrition_repository)
+    handler_class = nutrition_handler_factory(
+        nutrition_provider, nutrition_repository, recommendation_cache, precomputer,
+        job_manager,
+    )
     server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
+    httpd = server_class(server_address, handler_class, **server_options)
     httpd.serve_forever()
 
 
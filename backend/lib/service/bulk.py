@@ -0,0 +1,131 @@
+"""Bulk ingestion of meals, e.g. a history imported from another tracker."""
+
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import config
+from lib.database.session import BaseNutritionRepository
+from lib.service.interfaces import nutrition
+
+NDJSON_TYPE = 'application/x-ndjson'
+
+
+class BulkRequestError(ValueError):
+    """Exception raised when a bulk request body cannot be used at all."""
+
+
+def parse_bulk_body(body: bytes, content_type: str = config.JSON_TYPE) -> list:
+    """Decode a JSON array or NDJSON stream of meals.
+
+    Args:
+        body (bytes): request body.
+        content_type (str): Content-Type of the request, NDJSON_TYPE for one meal per line.
+
+    Returns:
+        list: decoded meals, not validated yet.
+
+    Raises:
+        BulkRequestError: If the body is not valid UTF-8 JSON or has too many meals.
+    """
+    try:
+        text = body.decode(config.UTF8)
+        if content_type.startswith(NDJSON_TYPE):
+            meal_items = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            meal_items = json.loads(text)
+    except ValueError as err:
+        raise BulkRequestError(f'Invalid JSON: {err}') from err
+    if not isinstance(meal_items, list):
+        raise BulkRequestError('Expected an array of meals')
+    if len(meal_items) > config.BULK_MAX_ITEMS:
+        raise BulkRequestError(f'At most {config.BULK_MAX_ITEMS} meals per request')
+    return meal_items
+
+
+def _validate(meal_item, now: datetime.datetime) -> dict:
+    if not isinstance(meal_item, dict) or not {'user_id', 'description'} <= meal_item.keys():
+        raise ValueError('Missing user_id or description')
+    if not isinstance(meal_item['description'], str) or not meal_item['description'].strip():
+        raise ValueError('description must be a non-empty string')
+    calories = meal_item.get('calories')
+    if calories is not None and (
+        isinstance(calories, bool) or not isinstance(calories, (int, float)) or calories < 0
+    ):
+        raise ValueError('calories must be a non-negative number')
+    created_date = meal_item.get('created_date')
+    if created_date is None:
+        created_date = now
+    elif isinstance(created_date, str):
+        created_date = datetime.datetime.fromisoformat(created_date)
+    else:
+        raise ValueError('created_date must be an ISO 8601 string')
+    return {
+        'user_id': str(meal_item['user_id']),
+        'description': meal_item['description'],
+        'calories': None if calories is None else float(calories),
+        'created_date': created_date,
+    }
+
+
+def _estimate(nutrition_provider: nutrition.NutritionProvider, meal: dict) -> dict:
+    if meal['calories'] is None:
+        meal['calories'] = nutrition_provider.get_nutrition(
+            meal_description=meal['description'],
+        ).calories
+    return meal
+
+
+def ingest_meals(
+    meal_items: list,
+    nutrition_provider: nutrition.NutritionProvider,
+    nutrition_repository: BaseNutritionRepository,
+) -> list[dict]:
+    """Validate, estimate and store meals, reporting the outcome of every meal.
+
+    Meals with calories skip the provider. The others are estimated by
+    config.BULK_ESTIMATE_WORKERS threads. Valid meals are written with
+    insert_meals in chunks of config.BULK_INSERT_CHUNK.
+
+    Args:
+        meal_items (list): meals decoded by parse_bulk_body.
+        nutrition_provider (nutrition.NutritionProvider): provider for meals without calories.
+        nutrition_repository (BaseNutritionRepository): repository to store meals.
+
+    Returns:
+        list[dict]: one outcome per meal in the same order, with status and
+        calories or an error message.
+    """
+    now = datetime.datetime.now()
+    outcomes = [{'index': index} for index in range(len(meal_items))]
+    pending = {}
+    with ThreadPoolExecutor(max_workers=config.BULK_ESTIMATE_WORKERS) as executor:
+        for index, meal_item in enumerate(meal_items):
+            try:
+                meal = _validate(meal_item, now)
+            except (TypeError, ValueError) as err:
+                outcomes[index].update({'status': config.ERROR, config.ERROR: str(err)})
+                continue
+            pending[index] = executor.submit(_estimate, nutrition_provider, meal)
+    meals = {}
+    for index, future in pending.items():
+        try:
+            meals[index] = future.result()
+        except Exception as err:
+            outcomes[index].update({
+                'status': config.ERROR,
+                config.ERROR: 'Server did not recognize the meal.',
+                'details': str(err),
+            })
+    indexes = list(meals)
+    for start in range(0, len(indexes), config.BULK_INSERT_CHUNK):
+        chunk = indexes[start:start + config.BULK_INSERT_CHUNK]
+        response = nutrition_repository.insert_meals([meals[index] for index in chunk])
+        for index in chunk:
+            if response['status'] == config.ERROR:
+                outcomes[index].update(response)
+            else:
+                outcomes[index].update({
+                    'status': 'success', 'calories': meals[index]['calories'],
+                })
+    return outcomes
@@ -0,0 +1,89 @@
+"""Thread-safe in-memory LRU cache with expiration."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Size-bounded least recently used cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Create an empty cache.
+
+        Args:
+            maxsize (int): maximum number of entries, the least recently used is evicted.
+            ttl (float): seconds after which an entry is considered stale.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a fresh value and mark it as recently used.
+
+        Args:
+            key (Hashable): cache key.
+
+        Returns:
+            Any | None: cached value or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key: Hashable) -> Any | None:
+        """Get a fresh value without counting a hit or a miss or marking it as used.
+
+        Args:
+            key (Hashable): cache key.
+
+        Returns:
+            Any | None: cached value or None if it is missing or stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): cache key.
+            value (Any): value to store.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an entry if it exists.
+
+        Args:
+            key (Hashable): cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        """Get cache counters.
+
+        Returns:
+            dict: number of hits, misses and stored entries.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
@@ -0,0 +1,134 @@
+"""Circuit breaker that fails fast while a dependency is unhealthy."""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+from lib import config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Exception raised instead of calling a dependency that is known to be failing."""
+
+
+class CircuitBreaker:
+    """Tracks recent calls and stops sending new ones when too many fail.
+
+    Closed: calls go through, the outcome of the last ``window`` calls is
+    kept. When at least ``failure_rate`` of them failed or took longer than
+    ``slow_call`` seconds, the circuit opens.
+
+    Open: calls fail at once with CircuitOpenError for ``open_time`` seconds.
+
+    Half-open: one probe call goes through; its success closes the circuit,
+    its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = config.CIRCUIT_FAILURE_RATE,
+        window: int = config.CIRCUIT_WINDOW,
+        min_calls: int = config.CIRCUIT_MIN_CALLS,
+        slow_call: float = config.CIRCUIT_SLOW_CALL,
+        open_time: float = config.CIRCUIT_OPEN_TIME,
+        ignored: tuple[type[Exception], ...] = (),
+    ) -> None:
+        """Create a closed circuit.
+
+        Args:
+            failure_rate (float): share of failed or slow calls that opens the circuit.
+            window (int): number of recent calls the rate is computed over.
+            min_calls (int): number of calls needed before the circuit can open.
+            slow_call (float): seconds after which a successful call counts as failed.
+            open_time (float): seconds calls are rejected before a probe is allowed.
+            ignored (tuple[type[Exception], ...]): exceptions that mean the dependency
+                answered, e.g. it did not recognize the input.
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.open_time = open_time
+        self.ignored = ignored
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def protect(self) -> Iterator[None]:
+        """Run one call to the dependency.
+
+        Yields:
+            None: the block that calls the dependency.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        self._admit()
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        except self.ignored:
+            failed = False
+            raise
+        except GeneratorExit:
+            failed = False
+            raise
+        finally:
+            self._record(failed or time.monotonic() - started > self.slow_call)
+
+    def stats(self) -> dict:
+        """Get the state of the circuit.
+
+        Returns:
+            dict: state and share of failed calls among the recent ones.
+        """
+        with self._lock:
+            return {'state': self.state, 'failure_rate': self._current_rate()}
+
+    def _admit(self):
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_time:
+                    raise CircuitOpenError('LLM is unavailable, try again later')
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError('LLM is recovering, try again later')
+                self._probing = True
+
+    def _record(self, failed):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == OPEN:
+                return
+            self._outcomes.append(failed)
+            enough_calls = len(self._outcomes) >= self.min_calls
+            if enough_calls and self._current_rate() >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _current_rate(self):
+        if not self._outcomes:
+            return 0
+        return sum(self._outcomes) / len(self._outcomes)
@@ -1,7 +1,8 @@
-"""Class with interface of NutritionProvider and dataclass NutritionInfo."""
+"""Interfaces of NutritionProvider, AsyncNutritionProvider and dataclass NutritionInfo."""
 
 import abc
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Iterator
 
 
 @dataclass
@@ -10,9 +11,23 @@ class NutritionInfo:
 
     Attributes:
         calories (float): The number of calories in the meal.
+        proteins (float | None): Grams of proteins, None if unknown.
+        carbs (float | None): Grams of carbohydrates, None if unknown.
+        fats (float | None): Grams of fats, None if unknown.
     """
 
     calories: float
+    proteins: float | None = None
+    carbs: float | None = None
+    fats: float | None = None
+
+    def known_values(self) -> dict:
+        """Get the fields that have a value.
+
+        Returns:
+            dict: field names mapped to values, unknown macros are left out.
+        """
+        return {key: value for key, value in asdict(self).items() if value is not None}
 
 
 class NutritionProvider(abc.ABC):
@@ -25,3 +40,55 @@ class NutritionProvider(abc.ABC):
         Args:
             meal_description (str): The description of the meal.
         """
+
+    @abc.abstractmethod
+    def get_recommendations(self, past_data: list[NutritionInfo | None]) -> str:
+        """Provide dietary recommendations based on past nutrition data.
+
+        Args:
+            past_data (list[NutritionInfo | None]): calories by day, None for days without data.
+        """
+
+    def stream_recommendations(self, past_data: list[NutritionInfo | None]) -> Iterator[str]:
+        """Provide recommendations in parts as they are generated.
+
+        Providers that cannot stream give the whole answer as one part.
+
+        Args:
+            past_data (list[NutritionInfo | None]): calories by day, None for days without data.
+
+        Yields:
+            str: next part of the recommendations.
+        """
+        yield self.get_recommendations(past_data)
+
+    def stats(self) -> dict:
+        """Get runtime counters of the provider for /api/v1/metrics.
+
+        Returns:
+            dict: counters by component, empty if the provider has none.
+        """
+        return {}
+
+
+class AsyncNutritionProvider(abc.ABC):
+    """Abstract base class for a nutrition provider used by the asyncio server."""
+
+    @abc.abstractmethod
+    async def get_nutrition(self, meal_description: str) -> NutritionInfo:
+        """Get the nutritional information for a given meal description.
+
+        Args:
+            meal_description (str): The description of the meal.
+        """
+
+    @abc.abstractmethod
+    async def get_recommendations(self, past_data: list[NutritionInfo | None]) -> str:
+        """Provide dietary recommendations based on past nutrition data.
+
+        Args:
+            past_data (list[NutritionInfo | None]): calories by day, None for days without data.
+        """
+
+    async def close(self) -> None:
+        """Release resources held by the provider."""
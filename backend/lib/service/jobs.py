@@ -0,0 +1,184 @@
+"""Background jobs for requests that take too long to hold a connection open."""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from lib import config
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFullError(Exception):
+    """Exception raised when too many jobs are waiting to be processed."""
+
+
+class CallbackNotAllowedError(ValueError):
+    """Exception raised for a callback URL outside the configured allowlist."""
+
+
+def _path_within(path: str, prefix: str) -> bool:
+    prefix = prefix.rstrip('/')
+    return path == prefix or path.startswith(f'{prefix}/')
+
+
+class JobManager:
+    """Runs jobs in a pool of worker threads and keeps their results for polling.
+
+    A job is a function returning an HTTP status and a response body, the
+    same pair the synchronous endpoint would send. Finished jobs are
+    forgotten ``ttl`` seconds after they complete.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = config.JOB_WORKERS,
+        max_pending: int = config.JOB_MAX_PENDING,
+        ttl: float = config.JOB_TTL,
+        callback_allowlist: tuple[str, ...] = (),
+    ) -> None:
+        """Create the manager and its worker pool.
+
+        Args:
+            max_workers (int): number of jobs processed concurrently.
+            max_pending (int): number of unfinished jobs accepted at once.
+            ttl (float): seconds a finished job can still be polled.
+            callback_allowlist (tuple[str, ...]): URL prefixes callbacks may be sent to,
+                e.g. "https://bot.example/callbacks/"; empty to disable callbacks.
+        """
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.callback_allowlist = tuple(urlsplit(prefix) for prefix in callback_allowlist)
+        self._jobs: dict[str, dict] = {}
+        self._finished_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='nutritioner-job',
+        )
+
+    def submit(self, func, *args, callback_url: str | None = None) -> dict:
+        """Start a job.
+
+        Args:
+            func (Callable[..., tuple[int, dict]]): work returning HTTP status and body.
+            args: arguments for func.
+            callback_url (str | None): URL that receives the finished job as JSON POST.
+
+        Returns:
+            dict: the job with its id and status.
+
+        Raises:
+            JobQueueFullError: If max_pending jobs are not finished yet.
+            CallbackNotAllowedError: If callback_url is not in the allowlist.
+        """
+        if callback_url is not None and not self.callback_allowed(callback_url):
+            raise CallbackNotAllowedError('callback_url is not allowed')
+        job = {'job_id': uuid.uuid4().hex, 'status': PENDING}
+        with self._lock:
+            self._expire()
+            if len(self._jobs) - len(self._finished_at) >= self.max_pending:
+                raise JobQueueFullError('Too many jobs in progress')
+            self._jobs[job['job_id']] = job
+        self._executor.submit(self._run, job['job_id'], callback_url, func, *args)
+        return dict(job)
+
+    def callback_allowed(self, callback_url: str) -> bool:
+        """Check that a callback URL matches the allowlist.
+
+        Scheme and host must be equal to those of an allowed prefix and the
+        path must be its path or lie below it, compared by whole segments, so
+        the backend cannot be made to call internal services such as Ollama.
+
+        Args:
+            callback_url (str): URL sent by the client.
+
+        Returns:
+            bool: whether the finished job may be posted there.
+        """
+        if not isinstance(callback_url, str):
+            return False
+        url = urlsplit(callback_url)
+        return any(
+            url.scheme == prefix.scheme
+            and url.netloc == prefix.netloc
+            and _path_within(url.path, prefix.path)
+            for prefix in self.callback_allowlist
+        )
+
+    def get(self, job_id: str) -> dict | None:
+        """Get the current state of a job.
+
+        Args:
+            job_id (str): id returned by submit().
+
+        Returns:
+            dict | None: the job or None if it is unknown or expired.
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    def stats(self) -> dict:
+        """Get job counters.
+
+        Returns:
+            dict: number of unfinished and finished jobs kept in memory.
+        """
+        with self._lock:
+            finished = len(self._finished_at)
+            return {'pending': len(self._jobs) - finished, 'finished': finished}
+
+    def close(self) -> None:
+        """Wait for running jobs and stop the worker pool."""
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job_id, callback_url, func, *args):
+        self._update(job_id, status=RUNNING)
+        try:
+            http_status, response = func(*args)
+        except Exception as err:
+            http_status, response = config.INTERNAL_SERVER_ERROR, {
+                config.ERROR: 'Job failed', 'details': str(err),
+            }
+        job = self._update(
+            job_id,
+            status=DONE if http_status == config.OK else FAILED,
+            http_status=http_status,
+            response=response,
+        )
+        if callback_url:
+            self._notify(callback_url, job)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            if job['status'] in {DONE, FAILED}:
+                self._finished_at[job_id] = time.monotonic()
+            return dict(job)
+
+    def _notify(self, callback_url, job):
+        try:
+            requests.post(
+                callback_url, json=job, timeout=config.TIMEOUT, allow_redirects=False,
+            )
+        except requests.RequestException:
+            logging.exception('Failed to deliver job %s to %s', job['job_id'], callback_url)
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        expired = [
+            job_id for job_id, finished in self._finished_at.items() if finished < deadline
+        ]
+        for job_id in expired:
+            del self._finished_at[job_id]
+            del self._jobs[job_id]
@@ -0,0 +1,48 @@
+"""Logging of a single meal, shared by the synchronous and job-based API."""
+
+import datetime
+
+from lib import config
+from lib.database.session import BaseNutritionRepository
+from lib.service.circuit_breaker import CircuitOpenError
+from lib.service.interfaces import nutrition
+
+
+def log_meal(
+    nutrition_provider: nutrition.NutritionProvider,
+    nutrition_repository: BaseNutritionRepository,
+    user_id,
+    description: str,
+    created_date: datetime.datetime,
+) -> tuple[int, dict]:
+    """Estimate the calories of a meal and store it.
+
+    Args:
+        nutrition_provider (nutrition.NutritionProvider): class that provides interface.
+        nutrition_repository (BaseNutritionRepository): class that provides interface.
+        user_id (str | int): ID of the user.
+        description (str): description of the meal.
+        created_date (datetime.datetime): when the meal was eaten.
+
+    Returns:
+        tuple[int, dict]: HTTP status and response body.
+    """
+    try:
+        nutrition_info = nutrition_provider.get_nutrition(meal_description=description)
+    except CircuitOpenError as err:
+        return config.SERVICE_UNAVAILABLE, {config.ERROR: str(err)}
+    except Exception as err:
+        return config.BAD_REQUEST, {
+            config.ERROR: 'Server did not recognize the request.',
+            'details': str(err),
+        }
+
+    response = nutrition_repository.insert_meal(
+        user_id=user_id,
+        description=description,
+        calories=nutrition_info.calories,
+        created_date=created_date,
+    )
+    if response['status'] == config.ERROR:
+        return config.INTERNAL_SERVER_ERROR, response
+    return config.OK, {'calories': nutrition_info.calories}
@@ -0,0 +1,44 @@
+"""Normalization of meal descriptions for cache keys."""
+
+import re
+
+# Commas and slashes between digits belong to amounts such as "1,5" or "1/2".
+_INGREDIENT_SEPARATORS = re.compile(
+    r'[;+&]|(?<!\d)[,/]|[,/](?!\d)|\b(?:and|with|plus|и|с|со|плюс)\b',
+)
+_DECIMAL_COMMA = re.compile(r'(?<=\d),(?=\d)')
+_PUNCTUATION = re.compile(r'[^\w\s./]|(?<!\d)[./]|[./](?!\d)|_')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_description(meal_description: str) -> str:
+    """Bring a meal description to a canonical form.
+
+    Case, ``ё``, punctuation and extra whitespace are dropped and ingredients
+    are sorted, so "Coffee with milk." and "milk, coffee" give the same key.
+    Word order inside one ingredient ("2 eggs") is kept.
+
+    Args:
+        meal_description (str): raw description entered by the user.
+
+    Returns:
+        str: normalized description.
+    """
+    return ', '.join(sorted(split_ingredients(meal_description)))
+
+
+def split_ingredients(meal_description: str) -> list[str]:
+    """Split a meal description into normalized ingredients.
+
+    Args:
+        meal_description (str): raw description entered by the user.
+
+    Returns:
+        list[str]: non-empty ingredients in the order they were written.
+    """
+    text = _DECIMAL_COMMA.sub('.', meal_description.casefold().replace('ё', 'е'))
+    ingredients = (
+        _SPACES.sub(' ', _PUNCTUATION.sub(' ', part)).strip()
+        for part in _INGREDIENT_SEPARATORS.split(text)
+    )
+    return [ingredient for ingredient in ingredients if ingredient]
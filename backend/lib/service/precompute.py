@@ -0,0 +1,111 @@
+"""Background precomputation of recommendations for active users."""
+
+import heapq
+import logging
+import threading
+import time
+
+from lib import config
+from lib.database.session import BaseNutritionRepository
+from lib.service import stats
+from lib.service.interfaces import nutrition
+from lib.service.recommendation_cache import RecommendationCache
+
+
+class RecommendationPrecomputer:
+    """Generates the next recommendations of a user shortly after their meals change.
+
+    Every schedule() call moves the user's generation ``delay`` seconds into
+    the future, so a burst of meals leads to a single LLM call. The result is
+    stored in the RecommendationCache, where /api/v1/stats finds it.
+    """
+
+    def __init__(
+        self,
+        nutrition_provider: nutrition.NutritionProvider,
+        nutrition_repository: BaseNutritionRepository,
+        recommendation_cache: RecommendationCache,
+        delay: float = config.PRECOMPUTE_DELAY,
+    ) -> None:
+        """Create the precomputer and start its worker thread.
+
+        Args:
+            nutrition_provider (nutrition.NutritionProvider): provider of recommendations.
+            nutrition_repository (BaseNutritionRepository): repository with meals.
+            recommendation_cache (RecommendationCache): where results are stored.
+            delay (float): seconds without new meals before generation starts.
+        """
+        self.nutrition_provider = nutrition_provider
+        self.nutrition_repository = nutrition_repository
+        self.recommendation_cache = recommendation_cache
+        self.delay = delay
+        self.computed = 0
+        self.failed = 0
+        self._due: dict[str, float] = {}
+        self._schedule: list[tuple[float, str]] = []
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._work_forever, daemon=True)
+        self._worker.start()
+
+    def schedule(self, user_id) -> None:
+        """Drop current recommendations of a user and generate new ones later.
+
+        Args:
+            user_id (str | int): ID of the user whose meals changed.
+        """
+        user_id = str(user_id)
+        self.recommendation_cache.invalidate(user_id)
+        due = time.monotonic() + self.delay
+        with self._condition:
+            self._due[user_id] = due
+            heapq.heappush(self._schedule, (due, user_id))
+            self._condition.notify()
+
+    def stats(self) -> dict:
+        """Get precomputation counters.
+
+        Returns:
+            dict: number of waiting users, generated and failed recommendations.
+        """
+        with self._condition:
+            return {'pending': len(self._due), 'computed': self.computed, 'failed': self.failed}
+
+    def _work_forever(self):
+        while True:
+            user_id = self._next_due_user()
+            try:
+                self._precompute(user_id)
+            except Exception:
+                logging.exception('Failed to precompute recommendations for %s', user_id)
+                with self._condition:
+                    self.failed += 1
+
+    def _next_due_user(self):
+        with self._condition:
+            while True:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due, user_id = self._schedule[0]
+                if self._due.get(user_id) != due:
+                    heapq.heappop(self._schedule)
+                    continue
+                timeout = due - time.monotonic()
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+                heapq.heappop(self._schedule)
+                del self._due[user_id]
+                return user_id
+
+    def _precompute(self, user_id):
+        daily_calories = self.nutrition_repository.get_daily_calories(user_id)
+        if not daily_calories or isinstance(daily_calories, dict):
+            return
+        past_data = stats.daily_calories_to_past_data(daily_calories)
+        if self.recommendation_cache.contains(user_id, past_data):
+            return
+        recommendations = self.nutrition_provider.get_recommendations(past_data)
+        self.recommendation_cache.put(user_id, past_data, recommendations)
+        with self._condition:
+            self.computed += 1
@@ -0,0 +1,91 @@
+"""Cache of generated recommendations per user."""
+
+from lib import config
+from lib.service.cache import LRUCache
+from lib.service.interfaces import nutrition
+from lib.service.stats import past_data_key
+
+
+class RecommendationCache:
+    """Remembers the last recommendations of every user with the data they were made for.
+
+    An entry is used only while the user's 7-day calorie vector, the model
+    and the prompt version are the same, and it is dropped as soon as a new
+    meal of the user is stored.
+    """
+
+    def __init__(
+        self, model: str, prompt_version: str,
+        maxsize: int = config.RECOMMENDATION_CACHE_SIZE,
+        ttl: float = config.RECOMMENDATION_CACHE_TTL,
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            model (str): name of the model that generates recommendations.
+            prompt_version (str): version of the recommendations prompt.
+            maxsize (int): maximum number of users with cached recommendations.
+            ttl (float): seconds after which recommendations are generated again.
+        """
+        self.model = model
+        self.prompt_version = prompt_version
+        self.cache = LRUCache(maxsize, ttl)
+
+    def get(self, user_id, past_data: list[nutrition.NutritionInfo | None]) -> str | None:
+        """Get recommendations made for exactly this data.
+
+        Args:
+            user_id (str | int): ID of the user.
+            past_data (list[NutritionInfo | None]): current calories by day.
+
+        Returns:
+            str | None: recommendations or None if they have to be generated.
+        """
+        entry = self.cache.get(str(user_id))
+        if entry is None or entry[0] != self._key(past_data):
+            return None
+        return entry[1]
+
+    def contains(self, user_id, past_data: list[nutrition.NutritionInfo | None]) -> bool:
+        """Check for recommendations made for this data without touching the counters.
+
+        Background work uses it, so the counters only describe user requests.
+
+        Args:
+            user_id (str | int): ID of the user.
+            past_data (list[NutritionInfo | None]): current calories by day.
+
+        Returns:
+            bool: whether get() would return recommendations.
+        """
+        entry = self.cache.peek(str(user_id))
+        return entry is not None and entry[0] == self._key(past_data)
+
+    def put(self, user_id, past_data: list[nutrition.NutritionInfo | None], text: str) -> None:
+        """Store recommendations of a user.
+
+        Args:
+            user_id (str | int): ID of the user.
+            past_data (list[NutritionInfo | None]): calories by day the text was made for.
+            text (str): the recommendations.
+        """
+        self.cache.put(str(user_id), (self._key(past_data), text))
+
+    def invalidate(self, user_id) -> None:
+        """Forget recommendations of a user whose meals changed.
+
+        Args:
+            user_id (str | int): ID of the user.
+        """
+        self.cache.invalidate(str(user_id))
+
+    def stats(self) -> dict:
+        """Get cache counters.
+
+        Returns:
+            dict: number of hits, misses and stored users.
+        """
+        return self.cache.stats()
+
+    def _key(self, past_data):
+        return (past_data_key(past_data), self.model, self.prompt_version)
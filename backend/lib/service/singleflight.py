@@ -0,0 +1,54 @@
+"""Coalescing of concurrent identical calls."""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class SingleFlight:
+    """Run only one call per key at a time and share its outcome with concurrent callers."""
+
+    def __init__(self) -> None:
+        """Create an empty registry of calls in flight."""
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call func or wait for the call with the same key that is already running.
+
+        Args:
+            key (Hashable): identity of the call.
+            func (Callable): function to call.
+            args: positional arguments for func.
+            kwargs: keyword arguments for func.
+
+        Returns:
+            Any: result of the call, the same object for all callers with the key.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as err:
+            future.set_exception(err)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def in_flight(self) -> int:
+        """Get the number of keys being computed.
+
+        Returns:
+            int: number of calls in flight.
+        """
+        with self._lock:
+            return len(self._calls)
+
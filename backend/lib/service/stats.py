@@ -0,0 +1,99 @@
+"""Functions that turn stored meals into statistics for recommendations."""
+
+import datetime
+from typing import Iterable
+
+from lib.service.interfaces import nutrition
+
+DAYS_IN_WEEK = 7
+
+
+def sum_calories_by_day(
+    entries: Iterable[tuple[datetime.date, float]],
+    days: int = DAYS_IN_WEEK,
+    today: datetime.date | None = None,
+) -> list[float]:
+    """Sum calories into per-day buckets in one pass.
+
+    Args:
+        entries (Iterable[tuple[date, float]]): pairs of a date or datetime and calories,
+            in any order, e.g. meals or rows already summed by the database.
+        days (int): number of days including today.
+        today (date | None): first day of the window, taken once so that every
+            entry is compared with the same date. Defaults to the current date.
+
+    Returns:
+        list[float]: calories for today, yesterday and so on, entries outside
+        the window are skipped.
+    """
+    if today is None:
+        today = datetime.date.today()
+    totals = [0.0] * days
+    for created, calories in entries:
+        if isinstance(created, datetime.datetime):
+            created = created.date()
+        day = (today - created).days
+        if 0 <= day < days:
+            totals[day] += calories
+    return totals
+
+
+def meal_entries(meals) -> Iterable[tuple[datetime.datetime, float]]:
+    """Get (created_date, calories) pairs of meals for sum_calories_by_day.
+
+    Args:
+        meals (Iterable[Meal]): meals of a user.
+
+    Returns:
+        Iterable[tuple[datetime, float]]: pairs of a creation time and calories.
+    """
+    return ((meal.created_date, meal.calories) for meal in meals)
+
+
+def to_past_data(totals: list[float]) -> list[nutrition.NutritionInfo | None]:
+    """Turn per-day calories into the input of get_recommendations.
+
+    Args:
+        totals (list[float]): calories for today, yesterday and so on.
+
+    Returns:
+        list[NutritionInfo | None]: the same days, None for days without meals.
+    """
+    return [
+        nutrition.NutritionInfo(calories=calories) if calories else None
+        for calories in totals
+    ]
+
+
+def daily_calories_to_past_data(
+    daily_calories: list[tuple[datetime.date, float]],
+    days: int = DAYS_IN_WEEK,
+    today: datetime.date | None = None,
+) -> list[nutrition.NutritionInfo | None]:
+    """Arrange calories summed by day into the input of get_recommendations.
+
+    Args:
+        daily_calories (list[tuple[date, float]]): pairs of a day and calories eaten that day.
+        days (int): number of days including today.
+        today (date | None): first day of the window. Defaults to the current date.
+
+    Returns:
+        list[NutritionInfo | None]: calories for today, yesterday and so on,
+        None for days without meals.
+    """
+    return to_past_data(sum_calories_by_day(daily_calories, days, today))
+
+
+def past_data_key(past_data: list[nutrition.NutritionInfo | None]) -> tuple:
+    """Get a hashable key of the input of get_recommendations.
+
+    Args:
+        past_data (list[NutritionInfo | None]): calories by day, None for days without meals.
+
+    Returns:
+        tuple: the same values as nested tuples.
+    """
+    return tuple(
+        None if inform is None else tuple(inform.known_values().items())
+        for inform in past_data
+    )
@@ -0,0 +1,46 @@
+"""Prefix tree for matching inflected words against known stems."""
+
+
+class StemTrie:
+    """Finds the longest known stem a word starts with.
+
+    Inflected forms differ from the stem only by an ending, so "яйца",
+    "яйцо" and "eggs" are found by the stems "яйц" and "egg". Every stem
+    accepts only its own endings, so "сырок" and "eggnog" are not taken
+    for "сыр" and "egg".
+    """
+
+    def __init__(self) -> None:
+        """Create an empty tree."""
+        self._root: dict = {}
+
+    def add(self, stem: str, endings: frozenset[str]) -> None:
+        """Add a stem, or more endings to a stem added before.
+
+        Args:
+            stem (str): stem in normalized form.
+            endings (frozenset[str]): endings the stem takes, '' for the bare stem.
+        """
+        node = self._root
+        for letter in stem:
+            node = node.setdefault(letter, {})
+        node[''] = node.get('', frozenset()) | endings
+
+    def longest(self, word: str) -> str | None:
+        """Find the longest stem of a word.
+
+        Args:
+            word (str): word in normalized form.
+
+        Returns:
+            str | None: the stem or None if no stem is followed by one of its endings.
+        """
+        node = self._root
+        found = None
+        for position, letter in enumerate(word):
+            node = node.get(letter)
+            if node is None:
+                break
+            if word[position + 1:] in node.get('', ()):
+                found = word[:position + 1]
+        return found
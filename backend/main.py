@@ -1,17 +1,199 @@
 """Main file for starting the server."""
 
+import logging
 import os
+import sys
+import threading
 
-from lib import server
-from lib.database.main_db import init_db
+from lib import async_server, config, server
+from lib.database.async_session import AsyncNutritionRepository
+from lib.database.estimate_cache import EstimateRepository
+from lib.database.main_db import create_db_engine, init_async_db, init_db
 from lib.database.session import NutritionRepository
+from lib.database.write_behind import BufferedNutritionRepository
 from lib.datasources.providers import nutrition
+from lib.datasources.providers.nutrition_async import AsyncNutritionProviderImpl
+from lib.datasources.providers.nutrition_batching import BatchingNutritionProvider
+from lib.datasources.providers.nutrition_cached import (
+    CachedNutritionProvider,
+    PersistentCachedNutritionProvider,
+)
+from lib.datasources.providers.nutrition_circuit import CircuitBreakerNutritionProvider
+from lib.datasources.providers.nutrition_coalescing import CoalescingNutritionProvider
+from lib.datasources.providers.nutrition_offline import OfflineNutritionEstimator
+from lib.datasources.providers.nutrition_routing import RoutingNutritionProvider
+from lib.service.circuit_breaker import CircuitBreaker
+from lib.service.jobs import JobManager
+from lib.service.precompute import RecommendationPrecomputer
+from lib.service.recommendation_cache import RecommendationCache
 
-ollama_url = os.getenv('BASE_OLLAMA_URL')
+ollama_url = os.getenv('BASE_OLLAMA_URL', config.OLLAMA_URL)
 ollama_model = os.getenv('OLLAMA_MODEL')
+server_mode = os.getenv('SERVER_MODE', 'threaded')
+ollama_pool = {
+    'pool_connections': int(os.getenv('OLLAMA_POOL_CONNECTIONS', config.OLLAMA_POOL_CONNECTIONS)),
+    'pool_maxsize': int(os.getenv('OLLAMA_POOL_MAXSIZE', config.OLLAMA_POOL_MAXSIZE)),
+    'keep_alive': os.getenv('OLLAMA_KEEP_ALIVE'),
+}
 
-nutrition_provider = nutrition.NutritionProviderImpl(ollama_url, ollama_model)
-session = init_db()
-nutrition_repository = NutritionRepository(session)
 
-server.run(nutrition_repository, nutrition_provider)
+def build_circuit_breaker(slow_call: float) -> CircuitBreaker:
+    """Create a circuit breaker configured from the environment.
+
+    Args:
+        slow_call (float): seconds after which a successful call counts as failed.
+
+    Returns:
+        CircuitBreaker: closed circuit that ignores unusable LLM answers.
+    """
+    return CircuitBreaker(
+        failure_rate=float(os.getenv('CIRCUIT_FAILURE_RATE', config.CIRCUIT_FAILURE_RATE)),
+        window=int(os.getenv('CIRCUIT_WINDOW', config.CIRCUIT_WINDOW)),
+        min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', config.CIRCUIT_MIN_CALLS)),
+        slow_call=slow_call,
+        open_time=float(os.getenv('CIRCUIT_OPEN_TIME', config.CIRCUIT_OPEN_TIME)),
+        ignored=(nutrition.LLMException,),
+    )
+
+
+def warm_up(nutrition_provider: nutrition.NutritionProviderImpl) -> None:
+    """Load the model in the background without failing the startup.
+
+    Args:
+        nutrition_provider (nutrition.NutritionProviderImpl): provider to warm up.
+    """
+    try:
+        nutrition_provider.warm_up()
+    except Exception:
+        logging.exception('Failed to warm up the model')
+
+
+def build_nutrition_provider(session) -> nutrition.NutritionProvider:
+    """Create the LLM provider wrapped with caching and request coalescing.
+
+    Args:
+        session (_type_): SessionLocal.
+
+    Returns:
+        NutritionProvider: provider for the blocking server.
+    """
+    nutrition_provider = nutrition.NutritionProviderImpl(
+        ollama_url, ollama_model, **ollama_pool,
+        health_interval=float(os.getenv('OLLAMA_HEALTH_INTERVAL', config.OLLAMA_HEALTH_INTERVAL)),
+        stream_nutrition=os.getenv('OLLAMA_STREAM_NUTRITION') == '1',
+        ping_interval=float(os.getenv('OLLAMA_PING_INTERVAL', config.OLLAMA_PING_INTERVAL)),
+    )
+    if os.getenv('OLLAMA_WARMUP') == '1':
+        threading.Thread(target=warm_up, args=(nutrition_provider,), daemon=True).start()
+    if os.getenv('NUTRITION_BATCHING') == '1':
+        nutrition_provider = BatchingNutritionProvider(
+            nutrition_provider,
+            max_batch_size=int(os.getenv('NUTRITION_BATCH_SIZE', config.NUTRITION_BATCH_SIZE)),
+            max_latency=float(
+                os.getenv('NUTRITION_BATCH_LATENCY', config.NUTRITION_BATCH_LATENCY),
+            ),
+        )
+    if os.getenv('CIRCUIT_BREAKER', '1') == '1':
+        nutrition_provider = CircuitBreakerNutritionProvider(
+            nutrition_provider,
+            build_circuit_breaker(float(os.getenv('CIRCUIT_SLOW_CALL', config.CIRCUIT_SLOW_CALL))),
+            recommendations_breaker=build_circuit_breaker(float(os.getenv(
+                'CIRCUIT_RECOMMENDATIONS_SLOW_CALL', config.CIRCUIT_RECOMMENDATIONS_SLOW_CALL,
+            ))),
+        )
+    if os.getenv('NUTRITION_PERSISTENT_CACHE', '1') == '1':
+        nutrition_provider = PersistentCachedNutritionProvider(
+            nutrition_provider, EstimateRepository(session),
+            model=ollama_model, prompt_version=nutrition.PROMPT_VERSION,
+        )
+    if os.getenv('OFFLINE_NUTRITION', '1') == '1':
+        nutrition_provider = RoutingNutritionProvider(
+            nutrition_provider, OfflineNutritionEstimator(),
+            min_confidence=float(
+                os.getenv('OFFLINE_MIN_CONFIDENCE', config.OFFLINE_MIN_CONFIDENCE),
+            ),
+        )
+    nutrition_provider = CoalescingNutritionProvider(nutrition_provider)
+    cache_size = int(os.getenv('NUTRITION_CACHE_SIZE', config.NUTRITION_CACHE_SIZE))
+    if cache_size:
+        nutrition_provider = CachedNutritionProvider(
+            nutrition_provider, maxsize=cache_size,
+            ttl=float(os.getenv('NUTRITION_CACHE_TTL', config.NUTRITION_CACHE_TTL)),
+        )
+    return nutrition_provider
+
+
+async def create_async_app():
+    """Create the asyncio application inside the running event loop.
+
+    OLLAMA_WARMUP and OLLAMA_PING_INTERVAL are not supported in this mode,
+    the model is loaded by the first request.
+
+    Returns:
+        web.Application: application for the asyncio server.
+    """
+    async_session = await init_async_db()
+    return async_server.nutrition_app_factory(
+        AsyncNutritionProviderImpl(ollama_url, ollama_model, **ollama_pool),
+        AsyncNutritionRepository(async_session),
+    )
+
+
+def main():
+    """Start the server in the mode selected by SERVER_MODE."""
+    modes = ('async', *server.SERVER_CLASSES)
+    if server_mode not in modes:
+        sys.exit(f'Unknown SERVER_MODE {server_mode!r}, expected one of: {", ".join(modes)}')
+    if server_mode == 'async':
+        if os.getenv('OLLAMA_WARMUP') == '1' or os.getenv('OLLAMA_PING_INTERVAL'):
+            logging.warning('OLLAMA_WARMUP and OLLAMA_PING_INTERVAL are ignored in async mode')
+        async_server.run(create_async_app())
+        return
+
+    server_options = {}
+    if server_mode == 'threaded':
+        server_options = {
+            'max_workers': int(os.getenv('SERVER_MAX_WORKERS', config.SERVER_MAX_WORKERS)),
+            'queue_size': int(os.getenv('SERVER_QUEUE_SIZE', config.SERVER_QUEUE_SIZE)),
+        }
+    engine = create_db_engine()
+    session = init_db(engine)
+    nutrition_repository = NutritionRepository(session, engine)
+    if os.getenv('DB_WRITE_BEHIND') == '1':
+        nutrition_repository = BufferedNutritionRepository(
+            nutrition_repository,
+            max_batch_size=int(os.getenv('DB_WRITE_BATCH_SIZE', config.WRITE_BATCH_SIZE)),
+            max_delay=float(os.getenv('DB_WRITE_BATCH_DELAY', config.WRITE_BATCH_DELAY)),
+        )
+    nutrition_provider = build_nutrition_provider(session)
+    recommendation_cache = None
+    precomputer = None
+    cache_size = int(os.getenv('RECOMMENDATION_CACHE_SIZE', config.RECOMMENDATION_CACHE_SIZE))
+    if cache_size:
+        recommendation_cache = RecommendationCache(
+            ollama_model, nutrition.RECOMMENDATIONS_PROMPT_VERSION, maxsize=cache_size,
+            ttl=float(os.getenv('RECOMMENDATION_CACHE_TTL', config.RECOMMENDATION_CACHE_TTL)),
+        )
+    if recommendation_cache is not None and os.getenv('RECOMMENDATION_PRECOMPUTE') == '1':
+        precomputer = RecommendationPrecomputer(
+            nutrition_provider, nutrition_repository, recommendation_cache,
+            delay=float(os.getenv('RECOMMENDATION_PRECOMPUTE_DELAY', config.PRECOMPUTE_DELAY)),
+        )
+    job_manager = JobManager(
+        max_workers=int(os.getenv('JOB_WORKERS', config.JOB_WORKERS)),
+        max_pending=int(os.getenv('JOB_MAX_PENDING', config.JOB_MAX_PENDING)),
+        ttl=float(os.getenv('JOB_TTL', config.JOB_TTL)),
+        callback_allowlist=tuple(
+            prefix for prefix in os.getenv('JOB_CALLBACK_ALLOWLIST', '').split(',') if prefix
+        ),
+    )
+    server.run(
+        nutrition_repository, nutrition_provider,
+        server_class=server.SERVER_CLASSES[server_mode],
+        recommendation_cache=recommendation_cache, precomputer=precomputer,
+        job_manager=job_manager, **server_options,
+    )
+
+
+if __name__ == '__main__':
+    main()
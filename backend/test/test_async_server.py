@@ -0,0 +1,63 @@
+"""File for testing the asyncio server."""
+
+import datetime
+from unittest import mock
+
+from aiohttp.test_utils import AioHTTPTestCase
+
+from lib import config
+from lib.async_server import nutrition_app_factory
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES42 = 42
+CALORIES100 = 100
+CALORIES400 = 400
+
+
+class TestAsyncServer(AioHTTPTestCase):
+    """Class with tests for the asyncio server."""
+
+    async def get_application(self):
+        """Create the application with mocked provider and repository.
+
+        Returns:
+            web.Application: application under test.
+        """
+        self.repo_mock = mock.AsyncMock()
+        self.provider_mock = mock.AsyncMock()
+        return nutrition_app_factory(self.provider_mock, self.repo_mock)
+
+    async def test_POST(self):
+        """Test the POST request for creating a meal."""
+        self.provider_mock.get_nutrition.return_value = NutritionInfo(calories=CALORIES42)
+        self.repo_mock.insert_meal.return_value = {'status': 'ok'}
+
+        response = await self.client.post(
+            '/api/v1/meals', json={'user_id': '42', 'description': 'soup'},
+        )
+        self.assertEqual(response.status, config.OK)
+        self.assertEqual((await response.json())['calories'], CALORIES42)
+        self.provider_mock.get_nutrition.assert_awaited_once_with(meal_description='soup')
+        self.assertEqual(self.repo_mock.insert_meal.call_args.kwargs['user_id'], '42')
+
+    async def test_POST_missing_fields(self):
+        """Test the POST request without a description."""
+        response = await self.client.post('/api/v1/meals', json={'user_id': '42'})
+        self.assertEqual(response.status, config.BAD_REQUEST)
+
+    async def test_GET(self):
+        """Test the GET request for recommendations."""
+        today = datetime.date.today()
+        self.repo_mock.get_daily_calories.return_value = [
+            (today, CALORIES100),
+            (today - datetime.timedelta(days=2), CALORIES400),
+        ]
+        self.provider_mock.get_recommendations.return_value = 'ешьте овощи'
+
+        response = await self.client.get('/api/v1/stats', params={'user_id': '42'})
+        self.assertEqual(response.status, config.OK)
+        self.assertEqual((await response.json())['recommendations'], 'ешьте овощи')
+        self.provider_mock.get_recommendations.assert_awaited_once_with([
+            NutritionInfo(calories=CALORIES100), None, NutritionInfo(calories=CALORIES400),
+            None, None, None, None,
+        ])
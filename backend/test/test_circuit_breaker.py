@@ -0,0 +1,110 @@
+"""File for testing the circuit breaker."""
+
+import time
+from unittest import TestCase, mock
+
+from lib.datasources.providers.nutrition_circuit import CircuitBreakerNutritionProvider
+from lib.service.circuit_breaker import CircuitBreaker, CircuitOpenError
+from lib.service.interfaces.nutrition import NutritionInfo
+
+OPEN_TIME = 0.05
+CALORIES42 = 42
+
+
+class TestCircuitBreaker(TestCase):
+    """Class with tests for CircuitBreakerNutritionProvider."""
+
+    def setUp(self):
+        """Wrap a failing provider mock."""
+        self.provider_mock = mock.Mock()
+        self.provider_mock.get_nutrition = mock.MagicMock(side_effect=TimeoutError())
+        self.breaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=2, open_time=OPEN_TIME, ignored=(KeyError,),
+        )
+        self.recommendations_breaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=2, slow_call=OPEN_TIME, open_time=OPEN_TIME,
+        )
+        self.provider = CircuitBreakerNutritionProvider(
+            self.provider_mock, self.breaker, self.recommendations_breaker,
+        )
+
+    def fail_twice(self):
+        """Make two calls that time out."""
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                self.provider.get_nutrition('soup')
+
+    def test_opens_and_fails_fast(self):
+        """Test that calls are rejected without reaching the LLM once it keeps failing."""
+        self.fail_twice()
+
+        with self.assertRaises(CircuitOpenError):
+            self.provider.get_nutrition('soup')
+        self.assertEqual(self.provider_mock.get_nutrition.call_count, 2)
+        self.assertEqual(self.breaker.stats()['state'], 'open')
+
+    def test_stats_report_both_circuits(self):
+        """Test that the state of both circuits is reported with the wrapped counters."""
+        self.provider_mock.stats = mock.MagicMock(return_value={'inner': {}})
+        self.fail_twice()
+
+        circuits = self.provider.stats()['circuit_breaker']
+        self.assertEqual(circuits['nutrition']['state'], 'open')
+        self.assertEqual(circuits['recommendations'], {'state': 'closed', 'failure_rate': 0})
+        self.assertIn('inner', self.provider.stats())
+
+    def test_half_open_probe_closes(self):
+        """Test that a successful probe after open_time closes the circuit."""
+        self.fail_twice()
+        time.sleep(OPEN_TIME)
+        self.provider_mock.get_nutrition.side_effect = None
+        self.provider_mock.get_nutrition.return_value = NutritionInfo(calories=CALORIES42)
+
+        self.assertEqual(self.provider.get_nutrition('soup').calories, CALORIES42)
+        self.assertEqual(self.breaker.stats()['state'], 'closed')
+
+    def test_half_open_probe_fails(self):
+        """Test that a failed probe opens the circuit again."""
+        self.fail_twice()
+        time.sleep(OPEN_TIME)
+
+        with self.assertRaises(TimeoutError):
+            self.provider.get_nutrition('soup')
+        with self.assertRaises(CircuitOpenError):
+            self.provider.get_nutrition('soup')
+
+    def test_ignored_errors_do_not_open(self):
+        """Test that answers the LLM gave, even unusable ones, keep the circuit closed."""
+        self.provider_mock.get_nutrition.side_effect = KeyError()
+        for _ in range(3):
+            with self.assertRaises(KeyError):
+                self.provider.get_nutrition('stone')
+        self.assertEqual(self.breaker.stats()['state'], 'closed')
+
+    def test_recommendations_have_own_circuit(self):
+        """Test that failing recommendations do not stop meal estimates."""
+        self.provider_mock.get_recommendations = mock.MagicMock(side_effect=TimeoutError())
+        self.provider_mock.get_nutrition.side_effect = None
+        self.provider_mock.get_nutrition.return_value = NutritionInfo(calories=CALORIES42)
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                self.provider.get_recommendations([])
+
+        with self.assertRaises(CircuitOpenError):
+            self.provider.get_recommendations([])
+        self.assertEqual(self.provider.get_nutrition('soup').calories, CALORIES42)
+        self.assertEqual(self.breaker.stats()['state'], 'closed')
+
+    def test_stream_timed_until_first_chunk(self):
+        """Test that a stream read slowly by the client is not a slow call."""
+        self.provider_mock.stream_recommendations = mock.MagicMock(
+            side_effect=lambda past_data: iter(['Eat ', 'more']),
+        )
+        for _ in range(2):
+            chunks = []
+            for chunk in self.provider.stream_recommendations([]):
+                chunks.append(chunk)
+                time.sleep(OPEN_TIME)
+            self.assertEqual(chunks, ['Eat ', 'more'])
+
+        self.assertEqual(self.recommendations_breaker.stats()['failure_rate'], 0)
@@ -0,0 +1,61 @@
+"""File for testing the configuration of connection pools."""
+
+import os
+from unittest import TestCase, mock
+
+from lib.database import main_db
+from lib.datasources.providers.nutrition import NutritionProviderImpl
+
+POOL_CONNECTIONS = 2
+POOL_MAXSIZE = 3
+
+
+class TestEnginePool(TestCase):
+    """Class with tests for the database connection pool settings."""
+
+    @mock.patch.dict(os.environ, {
+        'PG_POOL_SIZE': '7',
+        'PG_MAX_OVERFLOW': '2',
+        'PG_POOL_TIMEOUT': '5',
+        'PG_POOL_RECYCLE': '60',
+        'PG_POOL_PRE_PING': '0',
+        'PG_STATEMENT_TIMEOUT': '1500',
+    })
+    def test_pool_options_reach_create_engine(self):
+        """Test that the environment settles the pool of the engine."""
+        with mock.patch.object(main_db, 'create_engine') as create_engine_mock, \
+                mock.patch.object(main_db.Base.metadata, 'create_all'), \
+                mock.patch.object(main_db, 'ensure_indexes'):
+            main_db.init_db()
+
+        options = create_engine_mock.call_args.kwargs
+        self.assertEqual(options['pool_size'], 7)
+        self.assertEqual(options['max_overflow'], 2)
+        self.assertEqual(options['pool_timeout'], 5)
+        self.assertEqual(options['pool_recycle'], 60)
+        self.assertFalse(options['pool_pre_ping'])
+        self.assertEqual(
+            options['connect_args'], {'options': '-c statement_timeout=1500'},
+        )
+
+    @mock.patch.dict(os.environ, {'PG_STATEMENT_TIMEOUT': '0'})
+    def test_statement_timeout_can_be_disabled(self):
+        """Test that no connect arguments are sent without a statement timeout."""
+        self.assertNotIn('connect_args', main_db.get_engine_options())
+
+
+class TestOllamaPool(TestCase):
+    """Class with tests for the pooled session of NutritionProviderImpl."""
+
+    def test_session_adapter(self):
+        """Test that pool limits reach the adapter of the keep-alive session."""
+        provider = NutritionProviderImpl(
+            'http://ollama', 'llm', pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE, health_interval=0,
+        )
+        adapter = provider.session.get_adapter('http://ollama/api/generate')
+
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], POOL_MAXSIZE)
+        self.assertTrue(adapter.poolmanager.connection_pool_kw['block'])
+        self.assertEqual(adapter._pool_connections, POOL_CONNECTIONS)  # noqa: WPS437
+        provider.close()
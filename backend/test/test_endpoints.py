@@ -0,0 +1,86 @@
+"""File for testing load balancing between Ollama nodes."""
+
+import asyncio
+from unittest import TestCase
+
+from lib import config
+from lib.datasources.providers.endpoints import (
+    NUTRITION,
+    RECOMMENDATIONS,
+    EndpointPool,
+    parse_urls,
+)
+
+FAST = 1.0
+SLOW = 10.0
+
+
+class TestEndpointPool(TestCase):
+    """Class with tests for EndpointPool."""
+
+    def setUp(self):
+        """Create a pool of two nodes."""
+        self.pool = EndpointPool(['http://a', 'http://b'], eject_failures=2, slow_factor=4)
+
+    def test_parse_urls(self):
+        """Test that comma-separated URLs are split and cleaned."""
+        self.assertEqual(parse_urls('http://a/, http://b'), ['http://a', 'http://b'])
+        self.assertEqual(parse_urls(None), [config.OLLAMA_URL])
+
+    def test_least_outstanding(self):
+        """Test that a busy node does not get the next request."""
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.assertNotEqual(first.url, second.url)
+
+    def test_failing_node_is_ejected(self):
+        """Test that failures in a row take a node out of rotation."""
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                with self.pool.request() as url:
+                    self.assertEqual(url, 'http://a')
+                    raise OSError()
+
+        for _ in range(3):
+            with self.pool.request() as url:
+                self.assertEqual(url, 'http://b')
+
+    def test_slow_node_is_ejected(self):
+        """Test that a node much slower than the others is taken out of rotation."""
+        endpoint_a, endpoint_b = self.pool.endpoints
+        self.pool.release(self.pool.acquire(), FAST, ok=True)
+        self.pool.release(self.pool.acquire(), SLOW, ok=True)
+
+        self.assertEqual(endpoint_a.latency, {NUTRITION: FAST})
+        self.assertGreater(endpoint_b.ejected_until, 0)
+        self.assertEqual(self.pool.acquire().url, 'http://a')
+
+    def test_latency_per_kind(self):
+        """Test that a node serving longer requests than the others is not ejected."""
+        endpoint_a, endpoint_b = self.pool.endpoints
+        self.pool.release(self.pool.acquire(), FAST, ok=True, kind=NUTRITION)
+        self.pool.release(self.pool.acquire(), SLOW, ok=True, kind=RECOMMENDATIONS)
+
+        self.assertEqual(endpoint_b.latency, {RECOMMENDATIONS: SLOW})
+        self.assertEqual(endpoint_b.ejected_until, 0)
+
+    def test_cancelled_request_is_not_failure(self):
+        """Test that a cancelled asyncio request does not count against the node."""
+        for _ in range(3):
+            with self.assertRaises(asyncio.CancelledError):
+                with self.pool.request():
+                    raise asyncio.CancelledError()
+
+        self.assertEqual(
+            [(endpoint.outstanding, endpoint.failures) for endpoint in self.pool.endpoints],
+            [(0, 0), (0, 0)],
+        )
+        self.assertFalse(any(endpoint['ejected'] for endpoint in self.pool.stats()))
+
+    def test_probe_ejects_unhealthy(self):
+        """Test that a node failing the health check gets no requests."""
+        self.pool.probe(lambda url: url != 'http://a')
+        self.assertEqual(self.pool.acquire().url, 'http://b')
+        self.assertEqual(
+            [endpoint['ejected'] for endpoint in self.pool.stats()], [True, False],
+        )
@@ -0,0 +1,66 @@
+"""File for testing the persistent nutrition estimate cache."""
+
+import unittest
+from unittest import mock
+
+from lib.database.estimate_cache import EstimateRepository
+from lib.database.models import NutritionEstimate
+from lib.datasources.providers.nutrition_cached import PersistentCachedNutritionProvider
+from lib.service.interfaces.nutrition import NutritionInfo
+from test.test_nutrition_repository import init_test_db
+
+CALORIES42 = 42.0
+PROTEINS3 = 3.0
+
+
+class TestPersistentCachedNutritionProvider(unittest.TestCase):
+    """Tests for PersistentCachedNutritionProvider with EstimateRepository."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test database connection."""
+        cls.SessionLocal = init_test_db()
+
+    def setUp(self):
+        """Set up a provider over the test database."""
+        self.provider_mock = mock.Mock()
+        self.provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42, proteins=PROTEINS3),
+        )
+        self.provider_mock.stats = mock.MagicMock(return_value={})
+        self.repo = EstimateRepository(self.SessionLocal)
+
+    def tearDown(self):
+        """Remove stored estimates."""
+        session = self.SessionLocal()
+        session.query(NutritionEstimate).delete()
+        session.commit()
+        session.close()
+
+    def test_estimate_is_shared(self):
+        """Test that a second provider reuses the estimate stored by the first one."""
+        first = PersistentCachedNutritionProvider(self.provider_mock, self.repo, 'llm', '1')
+        second = PersistentCachedNutritionProvider(self.provider_mock, self.repo, 'llm', '1')
+
+        first.get_nutrition('Coffee with milk')
+        nutrition_info = second.get_nutrition('milk, coffee')
+
+        self.assertEqual(nutrition_info, NutritionInfo(calories=CALORIES42, proteins=PROTEINS3))
+        self.provider_mock.get_nutrition.assert_called_once_with('Coffee with milk')
+        self.assertEqual(first.stats(), {'nutrition_persistent_cache': {'hits': 0, 'misses': 1}})
+        self.assertEqual(second.stats(), {'nutrition_persistent_cache': {'hits': 1, 'misses': 0}})
+
+    def test_prompt_version_is_part_of_key(self):
+        """Test that estimates of another prompt version are not reused."""
+        PersistentCachedNutritionProvider(
+            self.provider_mock, self.repo, 'llm', '1',
+        ).get_nutrition('soup')
+        PersistentCachedNutritionProvider(
+            self.provider_mock, self.repo, 'llm', '2',
+        ).get_nutrition('soup')
+
+        self.assertEqual(self.provider_mock.get_nutrition.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
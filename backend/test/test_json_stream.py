@@ -0,0 +1,35 @@
+"""File for testing incremental JSON parsing."""
+
+from unittest import TestCase
+
+from lib.datasources.providers.json_stream import JSONObjectStream
+
+ANSWER = '{"kilocalories": 250, "note": "a, {b}", "proteins": [1, 2], "fats": 3}\n\n  '
+
+
+class TestJSONObjectStream(TestCase):
+    """Class with tests for JSONObjectStream."""
+
+    def test_whole_object_by_characters(self):
+        """Test that the object is decoded once its closing brace arrives."""
+        parser = JSONObjectStream()
+        decoded = [parser.feed(char) for char in ANSWER]
+        closing = ANSWER.rindex('}')
+
+        self.assertTrue(all(fields is None for fields in decoded[:closing]))
+        self.assertEqual(decoded[closing], {
+            'kilocalories': 250, 'note': 'a, {b}', 'proteins': [1, 2], 'fats': 3,
+        })
+
+    def test_stops_at_required_fields(self):
+        """Test that the rest of the object is not waited for."""
+        parser = JSONObjectStream(required=('kilocalories',))
+        self.assertIsNone(parser.feed('{"kilocalories": 25'))
+        self.assertEqual(parser.feed('0, "no'), {'kilocalories': 250})
+        self.assertFalse(parser.complete)
+
+    def test_invalid_field(self):
+        """Test that a broken field is reported."""
+        parser = JSONObjectStream()
+        with self.assertRaises(ValueError):
+            parser.feed('{"kilocalories": twenty}')
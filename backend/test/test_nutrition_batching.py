@@ -0,0 +1,99 @@
+"""File for testing micro-batching of meal estimates."""
+
+import json
+import threading
+from unittest import TestCase, mock
+
+from lib.datasources.providers.nutrition import LLMException, parse_nutrition_batch_response
+from lib.datasources.providers.nutrition_batching import BatchingNutritionProvider
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES100 = 100.0
+CALORIES200 = 200.0
+LATENCY = 0.5
+
+
+class TestBatchingNutritionProvider(TestCase):
+    """Tests for BatchingNutritionProvider."""
+
+    def setUp(self):
+        """Set up a batching provider over a mocked LLM provider."""
+        self.provider_mock = mock.Mock()
+        self.provider = BatchingNutritionProvider(
+            self.provider_mock, max_batch_size=2, max_latency=LATENCY,
+        )
+
+    def _estimate_concurrently(self, descriptions):
+        results = {}
+
+        def estimate(description):
+            try:
+                results[description] = self.provider.get_nutrition(description)
+            except LLMException as err:
+                results[description] = err
+
+        threads = [
+            threading.Thread(target=estimate, args=(description,))
+            for description in descriptions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_meals_share_one_call(self):
+        """Test that meals arriving together are estimated with one call."""
+        self.provider_mock.get_nutrition_batch = mock.MagicMock(
+            side_effect=lambda descriptions: [
+                NutritionInfo(calories=CALORIES100 if description == 'soup' else CALORIES200)
+                for description in descriptions
+            ],
+        )
+
+        results = self._estimate_concurrently(['soup', 'rice'])
+
+        self.assertEqual(results['soup'], NutritionInfo(calories=CALORIES100))
+        self.assertEqual(results['rice'], NutritionInfo(calories=CALORIES200))
+        self.provider_mock.get_nutrition_batch.assert_called_once()
+        self.provider_mock.get_nutrition.assert_not_called()
+
+    def test_unusable_batch_falls_back(self):
+        """Test that meals are estimated one by one if the batch answer is unusable."""
+        self.provider_mock.get_nutrition_batch = mock.MagicMock(side_effect=LLMException())
+        self.provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES100),
+        )
+
+        results = self._estimate_concurrently(['soup', 'rice'])
+
+        self.assertEqual(results['rice'], NutritionInfo(calories=CALORIES100))
+        self.assertEqual(self.provider_mock.get_nutrition.call_count, 2)
+
+
+class TestParseNutritionBatchResponse(TestCase):
+    """Tests for parse_nutrition_batch_response."""
+
+    def test_failed_meal_gets_exception(self):
+        """Test that only the unrecognized meal of a batch fails."""
+        payload = {'response': json.dumps(
+            {'meals': [{'kilocalories': CALORIES100}, {'kilocalories': 0}]},
+        )}
+
+        estimates = parse_nutrition_batch_response(payload, expected=2)
+
+        self.assertEqual(estimates[0], NutritionInfo(calories=CALORIES100))
+        self.assertIsInstance(estimates[1], LLMException)
+
+    def test_wrong_length(self):
+        """Test that an answer with a wrong number of meals is rejected."""
+        payload = {'response': json.dumps({'meals': [{'kilocalories': CALORIES100}]})}
+
+        with self.assertRaises(LLMException):
+            parse_nutrition_batch_response(payload, expected=2)
+
+    def test_not_an_object(self):
+        """Test that an answer that is not a JSON object is reported as a LLM failure."""
+        for answer in ([{'kilocalories': 1}], 42):
+            with self.assertRaises(LLMException):
+                parse_nutrition_batch_response({'response': json.dumps(answer)}, expected=1)
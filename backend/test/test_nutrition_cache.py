@@ -0,0 +1,106 @@
+"""File for testing the nutrition cache."""
+
+from unittest import TestCase, mock
+
+from lib.datasources.providers.nutrition_cached import CachedNutritionProvider
+from lib.service.cache import LRUCache
+from lib.service.interfaces.nutrition import NutritionInfo
+from lib.service.normalization import normalize_description
+
+CALORIES42 = 42
+
+
+class TestNormalizeDescription(TestCase):
+    """Tests for normalize_description."""
+
+    def test_case_punctuation_and_spaces(self):
+        """Test that case, punctuation and extra spaces do not change the key."""
+        self.assertEqual(
+            normalize_description('  Coffee   with MILK! '),
+            normalize_description('coffee with milk'),
+        )
+
+    def test_ingredient_order(self):
+        """Test that ingredients are sorted while words inside them keep their order."""
+        self.assertEqual(
+            normalize_description('овсянка с бананом'),
+            normalize_description('Бананом, овсянка.'),
+        )
+        self.assertEqual(normalize_description('2 eggs and 1.5 toasts'), '1.5 toasts, 2 eggs')
+
+    def test_decimal_and_fractional_amounts(self):
+        """Test that commas and slashes inside amounts do not split ingredients."""
+        self.assertEqual(normalize_description('1,5 банана'), '1.5 банана')
+        self.assertEqual(normalize_description('1/2 банана'), '1/2 банана')
+        self.assertEqual(normalize_description('5 банана, 1'), '1, 5 банана')
+        self.assertNotEqual(
+            normalize_description('1,5 банана'), normalize_description('5 банана, 1'),
+        )
+        self.assertEqual(normalize_description('банан/яблоко'), 'банан, яблоко')
+
+
+class TestLRUCache(TestCase):
+    """Tests for LRUCache."""
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'size': 2})
+
+    def test_expiration(self):
+        """Test that stale entries are not returned."""
+        cache = LRUCache(maxsize=2, ttl=10)
+        with mock.patch('lib.service.cache.time.monotonic', return_value=0):
+            cache.put('a', 1)
+        with mock.patch('lib.service.cache.time.monotonic', return_value=11):
+            self.assertIsNone(cache.get('a'))
+
+
+class TestCachedNutritionProvider(TestCase):
+    """Tests for CachedNutritionProvider."""
+
+    def test_repeated_meal_is_cached(self):
+        """Test that the same meal in another form does not reach the provider."""
+        provider_mock = mock.Mock()
+        provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        provider = CachedNutritionProvider(provider_mock, maxsize=10, ttl=60)
+
+        self.assertEqual(provider.get_nutrition('coffee with milk').calories, CALORIES42)
+        self.assertEqual(provider.get_nutrition('Milk, coffee').calories, CALORIES42)
+        provider_mock.get_nutrition.assert_called_once_with('coffee with milk')
+        self.assertEqual(provider.cache.stats()['hits'], 1)
+
+    def test_stats_include_wrapped(self):
+        """Test that cache counters are reported with those of the wrapped providers."""
+        provider_mock = mock.Mock()
+        provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        provider_mock.stats = mock.MagicMock(return_value={'inner': {}})
+        provider = CachedNutritionProvider(provider_mock, maxsize=10, ttl=60)
+        provider.get_nutrition('soup')
+        provider.get_nutrition('soup')
+
+        self.assertEqual(provider.stats(), {
+            'inner': {}, 'nutrition_cache': {'hits': 1, 'misses': 1, 'size': 1},
+        })
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed estimate is retried."""
+        provider_mock = mock.Mock()
+        provider_mock.get_nutrition = mock.MagicMock(
+            side_effect=[ValueError(), NutritionInfo(calories=CALORIES42)],
+        )
+        provider = CachedNutritionProvider(provider_mock, maxsize=10, ttl=60)
+
+        with self.assertRaises(ValueError):
+            provider.get_nutrition('soup')
+        self.assertEqual(provider.get_nutrition('soup').calories, CALORIES42)
@@ -0,0 +1,84 @@
+"""File for testing offline nutrition estimates."""
+
+from unittest import TestCase, mock
+
+from lib.datasources.providers.nutrition_offline import (
+    SERVING_CONFIDENCE,
+    OfflineNutritionEstimator,
+)
+from lib.datasources.providers.nutrition_routing import RoutingNutritionProvider
+from lib.service.circuit_breaker import CircuitOpenError
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES42 = 42
+
+
+class TestOfflineNutritionEstimator(TestCase):
+    """Class with tests for OfflineNutritionEstimator."""
+
+    def setUp(self):
+        """Index the bundled food table."""
+        self.estimator = OfflineNutritionEstimator()
+
+    def test_amounts_and_units(self):
+        """Test that amounts, units and inflected names give the same estimate."""
+        for description in ('2 eggs', 'два яйца', '100g egg', '100 г яиц'):
+            nutrition_info, confidence = self.estimator.estimate(description)
+            self.assertEqual(nutrition_info.calories, 155)
+            self.assertEqual(confidence, 1)
+
+    def test_several_ingredients(self):
+        """Test that ingredients are summed."""
+        nutrition_info, _ = self.estimator.estimate('куриная грудка 150 г, 100 г риса')
+        self.assertEqual(nutrition_info.calories, 377.5)
+
+    def test_low_confidence(self):
+        """Test that a food without an amount or with unknown words is not trusted."""
+        self.assertLess(self.estimator.estimate('rice')[1], 1)
+        self.assertLess(self.estimator.estimate('apple juice')[1], 1)
+
+    def test_no_amount_is_a_guess(self):
+        """Test that countable foods and drinks without an amount are not trusted."""
+        for description in ('молоко', 'banana', 'coffee with milk', 'кофе с молоком'):
+            self.assertEqual(self.estimator.estimate(description)[1], SERVING_CONFIDENCE)
+
+    def test_unknown_food(self):
+        """Test that a meal with an unknown ingredient is not estimated."""
+        self.assertIsNone(self.estimator.estimate('борщ со сметаной'))
+
+    def test_only_real_endings(self):
+        """Test that a known stem with a foreign ending is not matched."""
+        for description in ('сырок', 'eggnog', '2 eggnogs', 'винегрет'):
+            self.assertIsNone(self.estimator.estimate(description))
+        for description in ('2 бананов', 'сыра 40 г', '100 г курятиной', 'tomatoes'):
+            self.assertIsNotNone(self.estimator.estimate(description))
+
+
+class TestRoutingNutritionProvider(TestCase):
+    """Class with tests for RoutingNutritionProvider."""
+
+    def setUp(self):
+        """Route between the offline estimator and an LLM mock."""
+        self.llm_mock = mock.Mock()
+        self.llm_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        self.provider = RoutingNutritionProvider(self.llm_mock, OfflineNutritionEstimator())
+
+    def test_confident_meal_skips_llm(self):
+        """Test that a simple meal is answered offline."""
+        self.assertEqual(self.provider.get_nutrition('a banana').calories, 106.8)
+        self.llm_mock.get_nutrition.assert_not_called()
+
+    def test_unsure_meal_goes_to_llm(self):
+        """Test that unknown and unsure meals are estimated by the LLM."""
+        self.assertEqual(self.provider.get_nutrition('борщ').calories, CALORIES42)
+        self.assertEqual(self.provider.get_nutrition('кофе с молоком').calories, CALORIES42)
+        self.assertEqual(self.provider.get_nutrition('rice').calories, CALORIES42)
+
+    def test_open_circuit_uses_offline_estimate(self):
+        """Test that an unsure offline estimate is better than an error while the LLM is down."""
+        self.llm_mock.get_nutrition.side_effect = CircuitOpenError()
+        self.assertEqual(self.provider.get_nutrition('rice').calories, 195)
+        with self.assertRaises(CircuitOpenError):
+            self.provider.get_nutrition('борщ')
@@ -0,0 +1,252 @@
+"""File for testing NutritionProviderImpl against a fake Ollama session."""
+
+import json
+import time
+from unittest import TestCase
+
+import requests
+
+from lib.datasources.providers.nutrition import (
+    LLMException,
+    NutritionProviderImpl,
+    nutrition_request_body,
+)
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES100 = 100.0
+PING_INTERVAL = 60
+
+
+class FakeResponse:
+    """Streamed Ollama response that counts the lines read from it."""
+
+    def __init__(self, lines):
+        """Create a response.
+
+        Args:
+            lines (list[bytes]): NDJSON lines of the answer.
+        """
+        self.lines = lines
+        self.read = 0
+        self.closed = False
+
+    def __enter__(self):
+        """Open the response.
+
+        Returns:
+            FakeResponse: self.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the response.
+
+        Args:
+            exc_info: exception raised inside the block.
+        """
+        self.closed = True
+
+    def raise_for_status(self):
+        """Accept the response."""
+
+    def iter_lines(self):
+        """Read the answer line by line.
+
+        Yields:
+            bytes: next line.
+        """
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+class FakeSession:
+    """Session that answers every POST with the same streamed tokens."""
+
+    def __init__(self, tokens, done=True):
+        """Create a session.
+
+        Args:
+            tokens (list[str]): generated text split into chunks.
+            done (bool): whether the last line says the generation is over.
+        """
+        self.response = FakeResponse([
+            json.dumps({'response': token, 'done': False}).encode() for token in tokens
+        ] + ([json.dumps({'response': '', 'done': True}).encode()] if done else []))
+        self.bodies = []
+
+    def post(self, url, data, timeout, stream=False):
+        """Record a request.
+
+        Args:
+            url (str): request URL.
+            data (str): request body.
+            timeout (float): seconds to wait.
+            stream (bool): whether the answer is read incrementally.
+
+        Returns:
+            FakeResponse: the prepared answer.
+        """
+        self.bodies.append(json.loads(data))
+        return self.response
+
+    def close(self):
+        """Close the session."""
+
+
+class TestStreamNutrition(TestCase):
+    """Class with tests for meal estimates read token by token."""
+
+    def setUp(self):
+        """Create a streaming provider with one node."""
+        self.provider = NutritionProviderImpl(
+            'http://ollama', 'llm', health_interval=0, stream_nutrition=True,
+        )
+
+    def tearDown(self):
+        """Stop the provider."""
+        self.provider.close()
+
+    def estimate(self, tokens, done=True):
+        """Estimate a meal with the given answer of the LLM.
+
+        Args:
+            tokens (list[str]): generated text split into chunks.
+            done (bool): whether the generation finishes after the tokens.
+
+        Returns:
+            NutritionInfo: the estimate.
+        """
+        self.provider.session = FakeSession(tokens, done)
+        return self.provider.get_nutrition('soup')
+
+    def test_stops_when_fields_known(self):
+        """Test that the answer is closed as soon as all fields are known."""
+        nutrition_info = self.estimate([
+            '{"kilocalories": 100, "proteins": 5,', ' "carbs": 10, "fats": 2,',
+            ' "comment": "hot"', '}',
+        ])
+
+        self.assertEqual(
+            nutrition_info, NutritionInfo(calories=CALORIES100, proteins=5, carbs=10, fats=2),
+        )
+        response = self.provider.session.response
+        self.assertEqual(response.read, 2)
+        self.assertTrue(response.closed)
+        self.assertTrue(self.provider.session.bodies[0]['stream'])
+
+    def test_done_without_estimate(self):
+        """Test that an answer ending before the fields are known is a LLM failure."""
+        with self.assertRaises(LLMException):
+            self.estimate(['{"kilocalories": 100'])
+
+    def test_complete_object_without_calories(self):
+        """Test that a finished object without calories is a LLM failure."""
+        with self.assertRaises(LLMException):
+            self.estimate(['{"proteins": 5}'], done=False)
+
+    def test_bad_answer_is_not_node_failure(self):
+        """Test that an unusable answer does not count against the node."""
+        for tokens in (
+            ['{"kilocalories": "many", "proteins": 5, "carbs": 10, "fats": 2}'],
+            ['{"kilocalories": tru,'],
+        ):
+            with self.assertRaises(LLMException):
+                self.estimate(tokens)
+
+        self.assertEqual(self.provider.endpoints.endpoints[0].failures, 0)
+
+    def test_stats_report_nodes(self):
+        """Test that node latency by kind of request is reported."""
+        self.estimate(['{"kilocalories": 100, "proteins": 5, "carbs": 10, "fats": 2}'])
+
+        nodes = self.provider.stats()['ollama_nodes']
+        self.assertEqual([node['url'] for node in nodes], ['http://ollama'])
+        self.assertEqual(list(nodes[0]['latency']), ['nutrition'])
+
+
+class TestRequestBody(TestCase):
+    """Class with tests for the body of generate requests."""
+
+    def test_keep_alive(self):
+        """Test that seconds are sent as a number and durations as a string."""
+        for keep_alive, expected in (('-1', -1), ('300', 300), ('30m', '30m')):
+            body = json.loads(nutrition_request_body('llm', 'soup', keep_alive=keep_alive))
+            self.assertEqual(body['keep_alive'], expected)
+
+        self.assertNotIn('keep_alive', json.loads(nutrition_request_body('llm', 'soup')))
+
+
+class FailingResponse:
+    """Response of a node that cannot load the model."""
+
+    def raise_for_status(self):
+        """Reject the response.
+
+        Raises:
+            RequestException: Always.
+        """
+        raise requests.RequestException('model not found')
+
+
+class WarmUpSession(FakeSession):
+    """Session whose first node fails and the others answer."""
+
+    def __init__(self):
+        """Create a session that records the nodes it is asked."""
+        super().__init__([])
+        self.urls = []
+
+    def post(self, url, data, timeout, stream=False):
+        """Record a request and fail it for the first node.
+
+        Args:
+            url (str): request URL.
+            data (str): request body.
+            timeout (float): seconds to wait.
+            stream (bool): whether the answer is read incrementally.
+
+        Returns:
+            FakeResponse | FailingResponse: answer of the node.
+        """
+        self.urls.append(url)
+        response = super().post(url, data, timeout, stream)
+        return FailingResponse() if len(self.urls) == 1 else response
+
+
+class TestWarmUp(TestCase):
+    """Class with tests for loading the model ahead of requests."""
+
+    def setUp(self):
+        """Create a provider with two nodes and a fake session."""
+        self.provider = NutritionProviderImpl(
+            'http://a,http://b', 'llm', health_interval=0, keep_alive='-1',
+        )
+        self.provider.session = WarmUpSession()
+
+    def tearDown(self):
+        """Stop the provider."""
+        self.provider.close()
+
+    def test_failing_node_does_not_stop_others(self):
+        """Test that every node is warmed up even if one of them fails."""
+        with self.assertLogs(level='ERROR'):
+            self.provider.warm_up()
+
+        session = self.provider.session
+        self.assertEqual(session.urls, ['http://a/api/generate', 'http://b/api/generate'])
+        self.assertEqual(session.bodies[1], {
+            'model': 'llm', 'prompt': '', 'stream': False, 'keep_alive': -1,
+        })
+
+    def test_ping_only_when_idle(self):
+        """Test that the model is pinged only after interval seconds without requests."""
+        self.provider.last_request = time.monotonic()
+        self.provider._ping_if_idle(PING_INTERVAL)  # noqa: WPS437
+        self.assertEqual(self.provider.session.urls, [])
+
+        self.provider.last_request = time.monotonic() - PING_INTERVAL
+        with self.assertLogs(level='ERROR'):
+            self.provider._ping_if_idle(PING_INTERVAL)  # noqa: WPS437
+        self.assertEqual(len(self.provider.session.urls), 2)
+        self.assertLess(time.monotonic() - self.provider.last_request, PING_INTERVAL)
@@ -2,10 +2,12 @@
 
 import unittest
 from datetime import datetime, timedelta
+from unittest import mock
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker
 
+from lib.database.migrations import ensure_indexes
 from lib.database.models import Base, Meal
 from lib.database.session import NutritionRepository
 
@@ -60,6 +62,24 @@ class TestNutritionRepository(unittest.TestCase):
         self.assertEqual(meal.calories, calories)
         self.assertEqual(meal.created_date, created_date)
 
+    def test_insert_meals(self):
+        """Test inserting several meals with one statement."""
+        created_date = datetime.now()
+        meals = [
+            {
+                'user_id': 'test_user', 'description': f'meal{index}',
+                'calories': 100.0 * index, 'created_date': created_date,
+            }
+            for index in range(3)
+        ]
+
+        output = self.repo.insert_meals(meals)
+
+        self.assertEqual(output['status'], 'success')
+        saved = self.session.query(Meal).filter_by(user_id='test_user').all()
+        self.assertEqual(sorted(meal.description for meal in saved), ['meal0', 'meal1', 'meal2'])
+        self.assertEqual(len({meal.id for meal in saved}), 3)
+
     def test_get_meals_for_last_week(self):
         """Test retrieving meals for the last week."""
         user_id = 'test_user'
@@ -88,6 +108,67 @@ class TestNutritionRepository(unittest.TestCase):
         self.assertTrue(all(meal.created_date >= now - timedelta(days=7) for meal in output))
         self.assertTrue(all(meal.user_id == user_id for meal in output))
 
+    def test_get_daily_calories(self):
+        """Test summing calories by day in the database."""
+        user_id = 'test_user'
+        now = datetime.now()
+        self.session.add_all([
+            Meal(user_id=user_id, description='meal1', calories=100.0, created_date=now),
+            Meal(user_id=user_id, description='meal2', calories=50.0, created_date=now),
+            Meal(
+                user_id=user_id, description='meal3',
+                calories=200.0, created_date=now - timedelta(days=2),
+            ),
+            Meal(
+                user_id=user_id, description='meal4',
+                calories=300.0, created_date=now - timedelta(days=7),
+            ),
+            Meal(user_id='other_user', description='meal5', calories=400.0, created_date=now),
+        ])
+        self.session.commit()
+
+        output = self.repo.get_daily_calories(user_id)
+
+        self.assertEqual(sorted(output, reverse=True), [
+            (now.date(), 150.0),
+            ((now - timedelta(days=2)).date(), 200.0),
+        ])
+
+
+class TestEnsureIndexes(unittest.TestCase):
+    """Tests for the index migration."""
+
+    def test_index_added_to_existing_table(self):
+        """Test that a meal table created without indexes gets the composite index."""
+        engine = create_engine(DATABASE_URL)
+        with engine.begin() as conn:
+            Meal.__table__.create(conn)
+            for index in Meal.__table__.indexes:
+                index.drop(conn)
+
+            ensure_indexes(conn)
+            ensure_indexes(conn)
+
+            indexes = inspect(conn).get_indexes('meal')
+        self.assertEqual(
+            [(index['name'], index['column_names']) for index in indexes],
+            [('ix_meal_user_id_created_date', ['user_id', 'created_date'])],
+        )
+
+    def test_postgres_build_has_no_statement_timeout(self):
+        """Test that concurrent index builds run without the statement timeout."""
+        conn = mock.Mock()
+        conn.dialect.name = 'postgresql'
+        conn.dialect.identifier_preparer.quote = lambda name: name
+        conn.dialect.identifier_preparer.format_table = lambda table: table.name
+
+        ensure_indexes(conn)
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertEqual(statements[0], 'SET statement_timeout = 0')
+        self.assertIn('CREATE INDEX CONCURRENTLY', statements[1])
+        self.assertEqual(statements[-1], 'RESET statement_timeout')
+
 
 if __name__ == '__main__':
     unittest.main()
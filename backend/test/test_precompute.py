@@ -0,0 +1,67 @@
+"""File for testing background precomputation of recommendations."""
+
+import datetime
+import time
+from unittest import TestCase, mock
+
+from lib.service import stats
+from lib.service.precompute import RecommendationPrecomputer
+from lib.service.recommendation_cache import RecommendationCache
+
+CALORIES300 = 300
+DELAY = 0.05
+WAIT_TIMEOUT = 5
+
+
+class TestRecommendationPrecomputer(TestCase):
+    """Class with tests for RecommendationPrecomputer."""
+
+    def setUp(self):
+        """Set up a precomputer over mocks."""
+        self.daily_calories = [(datetime.date.today(), CALORIES300)]
+        self.repo_mock = mock.Mock()
+        self.repo_mock.get_daily_calories = mock.MagicMock(return_value=self.daily_calories)
+        self.provider_mock = mock.Mock()
+        self.provider_mock.get_recommendations = mock.MagicMock(return_value='ешьте овощи')
+        self.cache = RecommendationCache('llm', '1')
+        self.precomputer = RecommendationPrecomputer(
+            self.provider_mock, self.repo_mock, self.cache, delay=DELAY,
+        )
+
+    def wait_computed(self, count):
+        """Wait until the precomputer has generated count recommendations.
+
+        Args:
+            count (int): expected number of generated recommendations.
+        """
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while self.precomputer.stats()['computed'] < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(DELAY / 5)
+
+    def test_fills_cache(self):
+        """Test that scheduled recommendations end up in the cache."""
+        self.precomputer.schedule(42)
+        self.wait_computed(1)
+
+        past_data = stats.daily_calories_to_past_data(self.daily_calories)
+        self.assertEqual(self.cache.get('42', past_data), 'ешьте овощи')
+
+    def test_burst_is_debounced(self):
+        """Test that several meals in a row lead to one LLM call."""
+        for _ in range(5):
+            self.precomputer.schedule(42)
+        self.wait_computed(1)
+        time.sleep(DELAY * 2)
+
+        self.provider_mock.get_recommendations.assert_called_once()
+        self.assertEqual(self.precomputer.stats()['pending'], 0)
+
+    def test_user_counters_untouched(self):
+        """Test that background work is not counted as hits or misses of users."""
+        for _ in range(2):
+            self.precomputer.schedule(42)
+            self.wait_computed(1)
+            time.sleep(DELAY * 2)
+
+        self.assertEqual(self.cache.stats(), {'hits': 0, 'misses': 0, 'size': 1})
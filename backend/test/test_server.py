@@ -3,22 +3,24 @@
 import datetime
 import http
 import threading
+import time
 from unittest import TestCase, mock
 
 import requests
 
 from lib import config
-from lib.database.models import Meal
-from lib.server import nutrition_handler_factory
+from lib.server import PooledHTTPServer, nutrition_handler_factory
 from lib.service.interfaces.nutrition import NutritionInfo
+from lib.service.jobs import JobManager
+from lib.service.recommendation_cache import RecommendationCache
 
 CALORIES500 = 500.0
-CALORIES100 = 100
-CALORIES200 = 200
 CALORIES400 = 400
 CALORIES1000 = 1000
 CALORIES300 = 300
 CALORIES42 = 42
+POLL_INTERVAL = 0.01
+POLL_ATTEMPTS = 500
 
 
 class TestHTTPServer(TestCase):
@@ -71,18 +73,17 @@ class TestHTTPServer(TestCase):
     def test_GET(self):
         """Test the GET request for recommendations."""
         user_id = '42'
-        now = datetime.datetime.now()
-        saved_meals = [
-            Meal(calories=CALORIES100, created_date=now),
-            Meal(calories=CALORIES200, created_date=now-datetime.timedelta(milliseconds=5)),
-            Meal(calories=CALORIES400, created_date=now-datetime.timedelta(days=2)),
-            Meal(calories=CALORIES1000, created_date=now-datetime.timedelta(days=4)),
+        today = datetime.date.today()
+        daily_calories = [
+            (today, CALORIES300),
+            (today - datetime.timedelta(days=2), CALORIES400),
+            (today - datetime.timedelta(days=4), CALORIES1000),
         ]
         expected_flattened = [
             NutritionInfo(calories=CALORIES300), None, NutritionInfo(calories=CALORIES400),
             None, NutritionInfo(calories=CALORIES1000), None, None,
         ]
-        self.repo_mock.get_meals_for_last_week = mock.MagicMock(return_value=saved_meals)
+        self.repo_mock.get_daily_calories = mock.MagicMock(return_value=daily_calories)
 
         test_recommendations = 'test recommendations'
         self.provider_mock.get_recommendations = mock.MagicMock(return_value=test_recommendations)
@@ -94,9 +95,103 @@ class TestHTTPServer(TestCase):
         self.assertEqual(response.status_code, config.OK)
         self.assertEqual(response.json()['recommendations'], test_recommendations)
 
-        self.repo_mock.get_meals_for_last_week.assert_called_once_with(user_id)
+        self.repo_mock.get_daily_calories.assert_called_once_with(user_id)
         self.provider_mock.get_recommendations.assert_called_once_with(expected_flattened)
 
+    def test_POST_bulk(self):
+        """Test importing several meals with one request."""
+        self.provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        self.repo_mock.insert_meals = mock.MagicMock(return_value={'status': 'success'})
+        ndjson = '\n'.join([
+            '{"user_id": "42", "description": "soup", "calories": 300}',
+            '{"user_id": "42", "description": "rice", "created_date": "2024-05-01T12:00:00"}',
+            '{"user_id": "42"}',
+        ])
+
+        response = requests.post(
+            f'{self._get_url()}/api/v1/meals/bulk', data=ndjson.encode(config.UTF8),
+            headers={config.HEADER_TYPE: 'application/x-ndjson'}, timeout=config.TIMEOUT,
+        )
+
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(response.json()['inserted'], 2)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'index': 0, 'status': 'success', 'calories': CALORIES300})
+        self.assertEqual(results[1]['calories'], CALORIES42)
+        self.assertEqual(results[2]['status'], config.ERROR)
+        self.provider_mock.get_nutrition.assert_called_once_with(meal_description='rice')
+        stored = self.repo_mock.insert_meals.call_args.args[0]
+        self.assertEqual(stored[1]['created_date'], datetime.datetime(2024, 5, 1, 12))
+
+    def test_POST_bulk_invalid_body(self):
+        """Test that a body that is not an array is rejected."""
+        response = requests.post(
+            f'{self._get_url()}/api/v1/meals/bulk', json={'user_id': '42'},
+            timeout=config.TIMEOUT,
+        )
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+
+    def test_POST_bulk_not_utf8(self):
+        """Test that a body that is not UTF-8 is rejected."""
+        response = requests.post(
+            f'{self._get_url()}/api/v1/meals/bulk', data=b'[{"description": "\xff"}]',
+            timeout=config.TIMEOUT,
+        )
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+
+    def test_POST_bulk_wrong_types(self):
+        """Test that meals with a wrong description or date fail before the database."""
+        self.repo_mock.insert_meals = mock.MagicMock(return_value={'status': 'success'})
+        response = requests.post(
+            f'{self._get_url()}/api/v1/meals/bulk', json=[
+                {'user_id': '42', 'description': 42, 'calories': 1},
+                {'user_id': '42', 'description': 'soup', 'calories': 1, 'created_date': 1},
+            ],
+            timeout=config.TIMEOUT,
+        )
+
+        statuses = [outcome['status'] for outcome in response.json()['results']]
+        self.assertEqual(statuses, [config.ERROR, config.ERROR])
+        self.repo_mock.insert_meals.assert_not_called()
+
+    def test_GET_stream(self):
+        """Test streaming recommendations as server-sent events."""
+        self.repo_mock.get_daily_calories = mock.MagicMock(
+            return_value=[(datetime.date.today(), CALORIES300)],
+        )
+        self.provider_mock.stream_recommendations = mock.MagicMock(
+            return_value=iter(['Ешьте', ' овощи']),
+        )
+
+        response = requests.get(
+            f'{self._get_url()}/api/v1/stats/stream', params={'user_id': '42'},
+            timeout=config.TIMEOUT,
+        )
+
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(response.headers[config.HEADER_TYPE], config.EVENT_STREAM_TYPE)
+        self.assertEqual(response.content.decode(config.UTF8).split('\n\n'), [
+            'event: message\ndata: {"recommendations": "Ешьте"}',
+            'event: message\ndata: {"recommendations": " овощи"}',
+            'event: done\ndata: {}',
+            '',
+        ])
+
+    def test_GET_metrics(self):
+        """Test the GET request for runtime metrics."""
+        pool_stats = {'size': 16, 'checked_in': 2, 'checked_out': 1, 'overflow': 0}
+        provider_stats = {'nutrition_cache': {'hits': 3, 'misses': 1, 'size': 1}}
+        self.repo_mock.get_pool_stats = mock.MagicMock(return_value=pool_stats)
+        self.provider_mock.stats = mock.MagicMock(return_value=provider_stats)
+
+        response = requests.get(f'{self._get_url()}/api/v1/metrics', timeout=config.TIMEOUT)
+
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(response.json()['db_pool'], pool_stats)
+        self.assertEqual(response.json()['nutrition'], provider_stats)
+
     def _get_url(self) -> str:
         """Get the URL for the test server.
 
@@ -104,3 +199,191 @@ class TestHTTPServer(TestCase):
             str: URL for the test server.
         """
         return f'http://localhost:{self.port}'
+
+
+class TestPooledHTTPServer(TestCase):
+    """Class with tests for the thread pool server."""
+
+    def setUp(self):
+        """Start a pooled server with one worker and no waiting queue."""
+        self.repo_mock = mock.Mock()
+        self.provider_mock = mock.Mock()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+        def slow_nutrition(meal_description):
+            self.started.set()
+            self.release.wait(config.TIMEOUT)
+            return NutritionInfo(calories=CALORIES42)
+
+        self.provider_mock.get_nutrition = mock.MagicMock(side_effect=slow_nutrition)
+        self.repo_mock.insert_meal = mock.MagicMock(return_value={'status': 'ok'})
+
+        server_handler = nutrition_handler_factory(self.provider_mock, self.repo_mock)
+        self.server = PooledHTTPServer(
+            ('localhost', 0), server_handler, max_workers=1, queue_size=0,
+        )
+        self.url = f'http://localhost:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server."""
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_rejects_when_pool_is_full(self):
+        """Test that requests beyond the pool capacity get 503 instead of waiting."""
+        meal = {'user_id': '42', 'description': 'soup'}
+        results = []
+        slow = threading.Thread(
+            target=lambda: results.append(requests.post(
+                f'{self.url}/api/v1/meals', json=meal, timeout=config.TIMEOUT,
+            )),
+        )
+        slow.start()
+        self.assertTrue(self.started.wait(config.TIMEOUT))
+
+        response = requests.get(
+            f'{self.url}/api/v1/stats', params={'user_id': '42'}, timeout=config.TIMEOUT,
+        )
+        self.assertEqual(response.status_code, config.SERVICE_UNAVAILABLE)
+
+        self.release.set()
+        slow.join()
+        self.assertEqual(results[0].status_code, config.OK)
+
+
+class TestRecommendationCache(TestCase):
+    """Class with tests for caching recommendations in the server."""
+
+    def setUp(self):
+        """Set up a server with a recommendation cache."""
+        self.repo_mock = mock.Mock()
+        self.provider_mock = mock.Mock()
+        self.repo_mock.get_daily_calories = mock.MagicMock(
+            return_value=[(datetime.date.today(), CALORIES300)],
+        )
+        self.repo_mock.insert_meal = mock.MagicMock(return_value={'status': 'ok'})
+        self.provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        self.provider_mock.get_recommendations = mock.MagicMock(return_value='ешьте овощи')
+
+        server_handler = nutrition_handler_factory(
+            self.provider_mock, self.repo_mock, RecommendationCache('llm', '1'),
+        )
+        self.server = http.server.HTTPServer(('localhost', 0), server_handler)
+        self.url = f'http://localhost:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_repeated_request_is_cached(self):
+        """Test that unchanged data does not reach the LLM twice."""
+        for _ in range(2):
+            response = requests.get(
+                f'{self.url}/api/v1/stats', params={'user_id': '42'}, timeout=config.TIMEOUT,
+            )
+            self.assertEqual(response.json()['recommendations'], 'ешьте овощи')
+
+        self.provider_mock.get_recommendations.assert_called_once()
+
+    def test_new_meal_invalidates(self):
+        """Test that a stored meal makes the next request generate again."""
+        requests.get(f'{self.url}/api/v1/stats', params={'user_id': '42'}, timeout=config.TIMEOUT)
+        requests.post(
+            f'{self.url}/api/v1/meals', json={'user_id': 42, 'description': 'soup'},
+            timeout=config.TIMEOUT,
+        )
+        requests.get(f'{self.url}/api/v1/stats', params={'user_id': '42'}, timeout=config.TIMEOUT)
+
+        self.assertEqual(self.provider_mock.get_recommendations.call_count, 2)
+
+
+class TestJobs(TestCase):
+    """Class with tests for meals posted in async mode."""
+
+    def setUp(self):
+        """Set up a server with a job manager."""
+        self.repo_mock = mock.Mock()
+        self.provider_mock = mock.Mock()
+        self.repo_mock.insert_meal = mock.MagicMock(return_value={'status': 'ok'})
+        self.provider_mock.get_nutrition = mock.MagicMock(
+            return_value=NutritionInfo(calories=CALORIES42),
+        )
+        self.job_manager = JobManager(max_workers=1)
+
+        server_handler = nutrition_handler_factory(
+            self.provider_mock, self.repo_mock, job_manager=self.job_manager,
+        )
+        self.server = http.server.HTTPServer(('localhost', 0), server_handler)
+        self.url = f'http://localhost:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server and the job manager."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.job_manager.close()
+
+    def test_POST_async(self):
+        """Test that an async meal is accepted at once and its result can be polled."""
+        response = requests.post(
+            f'{self.url}/api/v1/meals', json={'user_id': 42, 'description': 'soup'},
+            headers={'Prefer': 'respond-async'}, timeout=config.TIMEOUT,
+        )
+        self.assertEqual(response.status_code, config.ACCEPTED)
+        location = response.headers['Location']
+
+        for _ in range(POLL_ATTEMPTS):
+            job = requests.get(f'{self.url}{location}', timeout=config.TIMEOUT).json()
+            if job['status'] not in {'pending', 'running'}:
+                break
+            time.sleep(POLL_INTERVAL)
+
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['http_status'], config.OK)
+        self.assertEqual(job['response'], {'calories': CALORIES42})
+        self.repo_mock.insert_meal.assert_called_once()
+
+    def test_POST_async_callback_not_allowed(self):
+        """Test that a callback to a URL outside the allowlist is rejected."""
+        response = requests.post(
+            f'{self.url}/api/v1/meals',
+            json={
+                'user_id': 42, 'description': 'soup', 'async': True,
+                'callback_url': 'http://ollama:11434/api/generate',
+            },
+            timeout=config.TIMEOUT,
+        )
+
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.repo_mock.insert_meal.assert_not_called()
+
+    def test_callback_allowlist_by_segments(self):
+        """Test that callbacks are allowed only at or below an allowlisted path."""
+        job_manager = JobManager(callback_allowlist=('http://bot:8080/callbacks',))
+        self.addCleanup(job_manager.close)
+
+        for url in ('http://bot:8080/callbacks', 'http://bot:8080/callbacks/7'):
+            self.assertTrue(job_manager.callback_allowed(url))
+        for url in (
+            'http://bot:8080/callbacksevil', 'https://bot:8080/callbacks',
+            'http://bot:8081/callbacks', 'http://ollama:11434/api/generate',
+        ):
+            self.assertFalse(job_manager.callback_allowed(url))
+
+    def test_GET_unknown_job(self):
+        """Test that an unknown job is not found."""
+        response = requests.get(f'{self.url}/api/v1/jobs/missing', timeout=config.TIMEOUT)
+        self.assertEqual(response.status_code, config.NOT_FOUND)
@@ -0,0 +1,69 @@
+"""File for testing request coalescing."""
+
+import threading
+from concurrent.futures import Future
+from unittest import TestCase, mock
+
+from lib import config
+from lib.datasources.providers.nutrition_coalescing import CoalescingNutritionProvider
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES42 = 42
+WAITERS = 5
+
+
+class TestCoalescingNutritionProvider(TestCase):
+    """Tests for CoalescingNutritionProvider."""
+
+    def setUp(self):
+        """Set up a provider whose upstream call blocks until released."""
+        self.release = threading.Event()
+        self.provider_mock = mock.Mock()
+        self.provider = CoalescingNutritionProvider(self.provider_mock)
+
+    def test_concurrent_identical_requests(self):
+        """Test that concurrent identical requests share one upstream call."""
+        started = threading.Event()
+        joined = threading.Semaphore(0)
+        start_together = threading.Barrier(WAITERS)
+
+        def slow_nutrition(meal_description):
+            started.set()
+            self.release.wait(config.TIMEOUT)
+            return NutritionInfo(calories=CALORIES42)
+
+        class JoinedFuture(Future):
+            def result(self, timeout=None):
+                joined.release()
+                return super().result(timeout)
+
+        def get_nutrition():
+            start_together.wait(config.TIMEOUT)
+            results.append(self.provider.get_nutrition('Coffee with milk'))
+
+        self.provider_mock.get_nutrition = mock.MagicMock(side_effect=slow_nutrition)
+        results = []
+        threads = [threading.Thread(target=get_nutrition) for _ in range(WAITERS)]
+        with mock.patch('lib.service.singleflight.Future', JoinedFuture):
+            for thread in threads:
+                thread.start()
+            self.assertTrue(started.wait(config.TIMEOUT))
+            for _ in range(WAITERS - 1):
+                self.assertTrue(joined.acquire(timeout=config.TIMEOUT))
+            self.release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, [NutritionInfo(calories=CALORIES42)] * WAITERS)
+        self.provider_mock.get_nutrition.assert_called_once()
+
+    def test_error_is_shared_and_not_remembered(self):
+        """Test that a failure reaches the caller and the next request retries."""
+        self.provider_mock.get_recommendations = mock.MagicMock(
+            side_effect=[ValueError(), 'ешьте овощи'],
+        )
+        past_data = [NutritionInfo(calories=CALORIES42), None]
+
+        with self.assertRaises(ValueError):
+            self.provider.get_recommendations(past_data)
+        self.assertEqual(self.provider.get_recommendations(past_data), 'ешьте овощи')
@@ -0,0 +1,59 @@
+"""File for testing per-day calorie statistics."""
+
+import datetime
+from types import SimpleNamespace
+from unittest import TestCase
+
+from lib.service import stats
+from lib.service.interfaces.nutrition import NutritionInfo
+
+CALORIES100 = 100.0
+CALORIES200 = 200.0
+CALORIES300 = 300.0
+
+
+class TestSumCaloriesByDay(TestCase):
+    """Tests for sum_calories_by_day."""
+
+    def setUp(self):
+        """Fix the date the window starts from."""
+        self.today = datetime.date(2024, 5, 10)
+        self.midnight = datetime.datetime(2024, 5, 10)
+
+    def test_meals_are_bucketed_by_day(self):
+        """Test that meals of the same day are summed and old meals are skipped."""
+        meals = [
+            SimpleNamespace(calories=CALORIES100, created_date=self.midnight),
+            SimpleNamespace(
+                calories=CALORIES200, created_date=self.midnight + datetime.timedelta(hours=23),
+            ),
+            SimpleNamespace(
+                calories=CALORIES300, created_date=self.midnight - datetime.timedelta(seconds=1),
+            ),
+            SimpleNamespace(
+                calories=CALORIES300, created_date=self.midnight - datetime.timedelta(days=7),
+            ),
+        ]
+
+        totals = stats.sum_calories_by_day(stats.meal_entries(meals), today=self.today)
+
+        self.assertEqual(totals, [CALORIES300, CALORIES300, 0, 0, 0, 0, 0])
+
+    def test_window_length(self):
+        """Test a window other than a week with dates instead of datetimes."""
+        daily_calories = [
+            (self.today - datetime.timedelta(days=2), CALORIES100),
+            (self.today + datetime.timedelta(days=1), CALORIES200),
+        ]
+
+        totals = stats.sum_calories_by_day(daily_calories, days=3, today=self.today)
+
+        self.assertEqual(totals, [0, 0, CALORIES100])
+
+    def test_past_data(self):
+        """Test that days without meals become None."""
+        past_data = stats.daily_calories_to_past_data(
+            [(self.today, CALORIES100)], days=2, today=self.today,
+        )
+
+        self.assertEqual(past_data, [NutritionInfo(calories=CALORIES100), None])
@@ -0,0 +1,61 @@
+"""File for testing group commit of meal inserts."""
+
+import threading
+from datetime import datetime
+from unittest import TestCase, mock
+
+from lib import config
+from lib.database.write_behind import BufferedNutritionRepository
+
+MEALS = 4
+LATENCY = 0.5
+
+
+class TestBufferedNutritionRepository(TestCase):
+    """Tests for BufferedNutritionRepository."""
+
+    def setUp(self):
+        """Set up a buffered repository over a mocked one."""
+        self.repo_mock = mock.Mock()
+        self.repo = BufferedNutritionRepository(
+            self.repo_mock, max_batch_size=MEALS, max_delay=LATENCY,
+        )
+
+    def _insert_concurrently(self):
+        results = {}
+
+        def insert(index):
+            results[index] = self.repo.insert_meal(
+                'user', f'meal{index}', float(index), datetime.now(),
+            )
+
+        threads = [threading.Thread(target=insert, args=(index,)) for index in range(MEALS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_inserts_share_a_commit(self):
+        """Test that concurrent meals are written with one call."""
+        self.repo_mock.insert_meals = mock.MagicMock(return_value={'status': 'success'})
+
+        results = self._insert_concurrently()
+
+        self.assertEqual(list(results.values()), [{'status': 'success'}] * MEALS)
+        self.repo_mock.insert_meals.assert_called_once()
+        self.assertEqual(len(self.repo_mock.insert_meals.call_args.args[0]), MEALS)
+
+    def test_failed_batch_is_retried_one_by_one(self):
+        """Test that only the bad meal fails when its batch is rejected."""
+        def insert_meals(meals):
+            if any(meal['description'] == 'meal0' for meal in meals):
+                return {'status': config.ERROR}
+            return {'status': 'success'}
+
+        self.repo_mock.insert_meals = mock.MagicMock(side_effect=insert_meals)
+
+        results = self._insert_concurrently()
+
+        self.assertEqual(results[0], {'status': config.ERROR})
+        self.assertEqual(results[1], {'status': 'success'})
@@ -1,22 +1,35 @@
 """Module which runs the Nutritioner Telegram Bot."""
 import asyncio
-import json
 import logging
 import sys
 from os import getenv
 
-import requests
+import aiohttp
 from aiogram import Bot, Dispatcher
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 
+import sharding
+import webhook
+
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
 STATUS_OK = 200
+STATUS_ACCEPTED = 202
 STATUS_BAD_REQUEST = 400
 
 BOT_TOKEN = getenv('BOT_TOKEN')
 BASE_URL = getenv('BACKEND_BASE_URL')
+BOT_WORKERS = int(getenv('BOT_WORKERS', '1'))
+WEBHOOK_URL = getenv('BOT_WEBHOOK_URL')
+WEBHOOK_SECRET = getenv('BOT_WEBHOOK_SECRET')
+WEBHOOK_PORT = int(getenv('BOT_WEBHOOK_PORT', '8080'))
+WEBHOOK_QUEUE_SIZE = int(getenv('BOT_WEBHOOK_QUEUE_SIZE', str(webhook.WEBHOOK_QUEUE_SIZE)))
+BACKEND_TIMEOUT = float(getenv('BACKEND_TIMEOUT', '90'))
+BACKEND_CONNECTIONS = int(getenv('BACKEND_CONNECTIONS', '100'))
+BACKEND_ASYNC_MEALS = getenv('BACKEND_ASYNC_MEALS') == '1'
+JOB_POLL_INTERVAL = 1
+JOB_POLL_ATTEMPTS = 300
 
 dp = Dispatcher()
 
@@ -27,29 +40,92 @@ async def _command_start_handler(message: Message) -> None:
     await message.answer(f'Hello, {full_name}!')
 
 
+@dp.startup()
+async def _on_startup() -> None:
+    dp['http'] = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=BACKEND_CONNECTIONS),
+        timeout=aiohttp.ClientTimeout(total=BACKEND_TIMEOUT),
+    )
+
+
+@dp.shutdown()
+async def _on_shutdown() -> None:
+    await dp['http'].close()
+
+
 @dp.message(Command('recommendations'))
-async def _recommendations_handler(message: Message) -> None:
+async def _recommendations_handler(message: Message, http: aiohttp.ClientSession) -> None:
     user_id = message.from_user.id
-    resp = requests.get(f'{BASE_URL}/api/v1/stats', params={'user_id': user_id})
-    if resp.status_code != STATUS_OK:
-        return await message.answer('Произошла ошибка')
-    return await message.answer(resp.json()['recommendations'])
+    try:
+        async with http.get(
+            f'{BASE_URL}/api/v1/stats', params={'user_id': str(user_id)},
+        ) as resp:
+            if resp.status != STATUS_OK:
+                return await message.answer('Произошла ошибка')
+            recommendations = (await resp.json())['recommendations']
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return await message.answer('Произошла ошибка, попробуйте позже')
+    return await message.answer(recommendations)
+
+
+async def _wait_for_job(http: aiohttp.ClientSession, location: str) -> tuple[int, dict]:
+    for _ in range(JOB_POLL_ATTEMPTS):
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        async with http.get(f'{BASE_URL}{location}') as resp:
+            if resp.status != STATUS_OK:
+                return resp.status, {}
+            job = await resp.json()
+        if job['status'] not in {'pending', 'running'}:
+            return job['http_status'], job['response']
+    raise asyncio.TimeoutError()
+
+
+async def _post_meal(http: aiohttp.ClientSession, body: dict) -> tuple[int, dict]:
+    headers = {'Prefer': 'respond-async'} if BACKEND_ASYNC_MEALS else {}
+    async with http.post(f'{BASE_URL}/api/v1/meals', json=body, headers=headers) as resp:
+        if resp.status == STATUS_ACCEPTED:
+            location = resp.headers['Location']
+        elif resp.status == STATUS_OK:
+            return resp.status, await resp.json()
+        else:
+            return resp.status, {}
+    return await _wait_for_job(http, location)
 
 
 @dp.message()
-async def _meal_handler(message: Message) -> None:
+async def _meal_handler(message: Message, http: aiohttp.ClientSession) -> None:
     user_id = message.from_user.id
     description = message.text
     if not description:
         return await message.answer('Пожалуйста, введите текстовое описание')
-    body = json.dumps({'description': description, 'user_id': user_id})
-    resp = requests.post(f'{BASE_URL}/api/v1/meals', data=body)
-    if resp.status_code != STATUS_OK:
-        if resp.status_code == STATUS_BAD_REQUEST:
-            return await message.answer('Неверный запрос')
+    body = {'description': description, 'user_id': user_id}
+    try:
+        status, response = await _post_meal(http, body)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return await message.answer('Произошла ошибка, попробуйте позже')
+    if status == STATUS_BAD_REQUEST:
+        return await message.answer('Неверный запрос')
+    if status != STATUS_OK:
         return await message.answer('Произошла ошибка, попробуйте позже')
-    calories = float(resp.json()['calories'])
-    await message.answer(f'{calories} калорий.')
+    await message.answer(f"{float(response['calories'])} калорий.")
+
+
+def get_dispatcher() -> Dispatcher:
+    """Get the dispatcher with all handlers, used by worker processes.
+
+    Returns:
+        Dispatcher: dispatcher of this module.
+    """
+    return dp
 
 
-asyncio.run(dp.start_polling(Bot(token=BOT_TOKEN)))
+if __name__ == '__main__':
+    if WEBHOOK_URL:
+        webhook.run_webhook(
+            BOT_TOKEN, WEBHOOK_URL, WEBHOOK_SECRET, WEBHOOK_PORT, get_dispatcher,
+            queue_size=WEBHOOK_QUEUE_SIZE,
+        )
+    elif BOT_WORKERS > 1:
+        sharding.run_sharded(BOT_TOKEN, BOT_WORKERS, get_dispatcher)
+    else:
+        asyncio.run(dp.start_polling(Bot(token=BOT_TOKEN)))
@@ -0,0 +1,173 @@
+"""Module which spreads Telegram updates between bot worker processes by chat id."""
+import asyncio
+import logging
+import multiprocessing
+from typing import Awaitable, Callable
+
+from aiogram import Bot, Dispatcher
+
+POLL_TIMEOUT = 30
+RETRY_DELAY = 5
+SHARD_QUEUE_SIZE = 1000
+MAX_UPDATES_IN_WORK = 100
+CHAT_KEYS = (
+    'message', 'edited_message', 'channel_post', 'edited_channel_post',
+    'business_message', 'edited_business_message', 'my_chat_member',
+    'chat_member', 'chat_join_request', 'message_reaction', 'message_reaction_count',
+)
+USER_KEYS = (
+    'inline_query', 'chosen_inline_result', 'callback_query', 'shipping_query',
+    'pre_checkout_query', 'poll_answer',
+)
+
+
+def update_chat_id(update: dict) -> int:
+    """Get the id of the chat an update belongs to.
+
+    Updates without a chat are attributed to their user, updates without
+    both to their own id.
+
+    Args:
+        update (dict): raw update from the Telegram Bot API.
+
+    Returns:
+        int: id used to pick a shard.
+    """
+    for key in CHAT_KEYS:
+        if key in update:
+            return update[key]['chat']['id']
+    for key in USER_KEYS:
+        if key in update:
+            event = update[key]
+            message = event.get('message')
+            if message:
+                return message['chat']['id']
+            return event.get('from', event.get('user', {})).get('id', update['update_id'])
+    return update['update_id']
+
+
+class ChatSerializer:
+    """Runs coroutines of different chats concurrently and of one chat in order."""
+
+    def __init__(self, max_in_work: int) -> None:
+        """Create an empty serializer.
+
+        Args:
+            max_in_work (int): number of submitted coroutines that are running
+                or waiting for their chat, submit waits when it is reached.
+        """
+        self._tails: dict[int, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(max_in_work)
+
+    async def submit(self, chat_id: int, make_coroutine: Callable[[], Awaitable]) -> None:
+        """Schedule a coroutine after the previous one of the same chat.
+
+        Args:
+            chat_id (int): id of the chat.
+            make_coroutine (Callable[[], Awaitable]): creates the coroutine to run.
+        """
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run_after(self._tails.get(chat_id), make_coroutine))
+        self._tails[chat_id] = task
+        task.add_done_callback(lambda done: self._forget(chat_id, done))
+
+    async def wait(self) -> None:
+        """Wait until all submitted coroutines are done."""
+        await asyncio.gather(*self._tails.values(), return_exceptions=True)
+
+    async def _run_after(self, previous, make_coroutine):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await make_coroutine()
+        except Exception:
+            logging.exception('Failed to process update')
+
+    def _forget(self, chat_id, done):
+        self._slots.release()
+        if self._tails.get(chat_id) is done:
+            del self._tails[chat_id]
+
+
+async def _work(token: str, get_dispatcher: Callable[[], Dispatcher], updates) -> None:
+    bot = Bot(token=token)
+    dp = get_dispatcher()
+    serializer = ChatSerializer(MAX_UPDATES_IN_WORK)
+    loop = asyncio.get_running_loop()
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    try:
+        while True:
+            update = await loop.run_in_executor(None, updates.get)
+            if update is None:
+                break
+            await serializer.submit(
+                update_chat_id(update),
+                lambda raw=update: dp.feed_raw_update(bot, raw),
+            )
+        await serializer.wait()
+    finally:
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await bot.session.close()
+
+
+def run_worker(token: str, get_dispatcher: Callable[[], Dispatcher], updates) -> None:
+    """Process updates of the chats assigned to this worker process.
+
+    Args:
+        token (str): bot token.
+        get_dispatcher (Callable[[], Dispatcher]): returns the dispatcher with handlers,
+            it must be importable from the worker process.
+        updates (multiprocessing.Queue): raw updates, None stops the worker.
+    """
+    asyncio.run(_work(token, get_dispatcher, updates))
+
+
+async def _receive(token: str, shards: list) -> None:
+    bot = Bot(token=token)
+    loop = asyncio.get_running_loop()
+    offset = None
+    try:
+        while True:
+            try:
+                updates = await bot.get_updates(offset=offset, timeout=POLL_TIMEOUT)
+            except Exception:
+                logging.exception('Failed to fetch updates')
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            for update in updates:
+                offset = update.update_id + 1
+                raw = update.model_dump(mode='json', by_alias=True, exclude_none=True)
+                shard = shards[update_chat_id(raw) % len(shards)]
+                await loop.run_in_executor(None, shard.put, raw)
+    finally:
+        await bot.session.close()
+
+
+def run_sharded(token: str, workers: int, get_dispatcher: Callable[[], Dispatcher]) -> None:
+    """Receive updates in this process and handle them in worker processes.
+
+    Every chat is always handled by the same worker, so messages of one chat
+    are processed in the order they were sent.
+
+    Args:
+        token (str): bot token.
+        workers (int): number of worker processes.
+        get_dispatcher (Callable[[], Dispatcher]): returns the dispatcher with handlers.
+    """
+    context = multiprocessing.get_context('spawn')
+    shards = [context.Queue(SHARD_QUEUE_SIZE) for _ in range(workers)]
+    processes = [
+        context.Process(target=run_worker, args=(token, get_dispatcher, shard), daemon=True)
+        for shard in shards
+    ]
+    for process in processes:
+        process.start()
+    try:
+        asyncio.run(_receive(token, shards))
+    except KeyboardInterrupt:
+        logging.info('Stopping workers')
+    finally:
+        for shard in shards:
+            shard.put(None)
+        for process in processes:
+            process.join()
@@ -0,0 +1 @@
+"""File with name __init__."""
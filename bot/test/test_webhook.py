@@ -0,0 +1,42 @@
+"""File for testing the webhook ingress."""
+
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from webhook import consume_updates
+
+CHAT_ID = 5
+
+
+class FakeDispatcher:
+    """Dispatcher that records the updates fed to it."""
+
+    def __init__(self):
+        """Create a dispatcher without updates."""
+        self.updates = []
+
+    async def feed_raw_update(self, bot, update):
+        """Record an update.
+
+        Args:
+            bot (Bot): bot that answers the update.
+            update (dict): raw update.
+        """
+        self.updates.append(update)
+
+
+class TestConsumeUpdates(IsolatedAsyncioTestCase):
+    """Class with tests for consume_updates."""
+
+    async def test_bad_update_is_skipped(self):
+        """Test that an update without its chat does not stop the consumer."""
+        good = {'update_id': 2, 'message': {'chat': {'id': CHAT_ID}}}
+        queue: asyncio.Queue = asyncio.Queue()
+        for update in ({'update_id': 1, 'message': {}}, ['not', 'an', 'update'], good, None):
+            queue.put_nowait(update)
+        dp = FakeDispatcher()
+
+        with self.assertLogs(level='ERROR'):
+            await asyncio.wait_for(consume_updates(queue, None, dp), timeout=1)
+
+        self.assertEqual(dp.updates, [good])
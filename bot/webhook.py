@@ -0,0 +1,128 @@
+"""Module which receives Telegram updates through a webhook."""
+import asyncio
+import hmac
+import logging
+from typing import Callable
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from sharding import MAX_UPDATES_IN_WORK, ChatSerializer, update_chat_id
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+WEBHOOK_PATH = '/webhook'
+WEBHOOK_QUEUE_SIZE = 1000
+STATUS_UNAUTHORIZED = 401
+STATUS_BAD_REQUEST = 400
+STATUS_SERVICE_UNAVAILABLE = 503
+
+
+async def consume_updates(queue: asyncio.Queue, bot: Bot, dp: Dispatcher) -> None:
+    """Hand queued updates to the dispatcher until None is taken from the queue.
+
+    An update that cannot be scheduled, e.g. one without the fields its
+    type must have, is logged and skipped, so the queue keeps draining.
+
+    Args:
+        queue (asyncio.Queue): raw updates accepted by the webhook.
+        bot (Bot): bot that answers the updates.
+        dp (Dispatcher): dispatcher with handlers.
+    """
+    serializer = ChatSerializer(MAX_UPDATES_IN_WORK)
+    while True:
+        update = await queue.get()
+        if update is None:
+            break
+        try:
+            await serializer.submit(
+                update_chat_id(update),
+                lambda raw=update: dp.feed_raw_update(bot, raw),
+            )
+        except Exception:
+            logging.exception('Skipping update that cannot be handled: %s', update)
+    await serializer.wait()
+
+
+def webhook_app(bot: Bot, dp: Dispatcher, secret: str, queue_size: int) -> web.Application:
+    """Create the ingress application.
+
+    An accepted update is put into a bounded queue and answered at once;
+    when the queue is full Telegram gets 503 and delivers the update again
+    later. Updates of one chat are handled in the order they arrive.
+
+    Args:
+        bot (Bot): bot that answers the updates.
+        dp (Dispatcher): dispatcher with handlers.
+        secret (str): value Telegram sends in the secret token header.
+        queue_size (int): number of updates waiting to be handled.
+
+    Returns:
+        web.Application: application to serve.
+
+    Raises:
+        ValueError: If the secret is empty.
+    """
+    if not secret:
+        raise ValueError('Webhook secret is required')
+    queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    async def _receive(request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, '')
+        if not hmac.compare_digest(token.encode(), secret.encode()):
+            return web.Response(status=STATUS_UNAUTHORIZED)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=STATUS_BAD_REQUEST)
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return web.Response(status=STATUS_SERVICE_UNAVAILABLE)
+        return web.Response()
+
+    async def _on_startup(app: web.Application) -> None:
+        await dp.emit_startup(bot=bot, dispatcher=dp)
+        app['consumer'] = asyncio.create_task(consume_updates(queue, bot, dp))
+
+    async def _on_cleanup(app: web.Application) -> None:
+        await queue.put(None)
+        await app['consumer']
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await bot.session.close()
+
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, _receive)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def run_webhook(
+    token: str, url: str, secret: str, port: int,
+    get_dispatcher: Callable[[], Dispatcher], queue_size: int = WEBHOOK_QUEUE_SIZE,
+) -> None:
+    """Register the webhook and serve updates pushed by Telegram.
+
+    Several instances can run behind a load balancer with the same url and
+    secret; the order of messages is then kept only within one instance.
+
+    Args:
+        token (str): bot token.
+        url (str): public URL of the webhook, WEBHOOK_PATH included.
+        secret (str): secret token Telegram has to send with every update.
+        port (int): port to listen on.
+        get_dispatcher (Callable[[], Dispatcher]): returns the dispatcher with handlers.
+        queue_size (int): number of updates waiting to be handled.
+    """
+    bot = Bot(token=token)
+    dp = get_dispatcher()
+    app = webhook_app(bot, dp, secret, queue_size)
+
+    async def _set_webhook(_: web.Application) -> None:
+        await bot.set_webhook(
+            url, secret_token=secret, allowed_updates=dp.resolve_used_update_types(),
+        )
+        logging.info('Webhook is set to %s', url)
+
+    app.on_startup.append(_set_webhook)
+    web.run_app(app, port=port)